@@ -0,0 +1,61 @@
+# Check that the crawler decodes pages correctly, served from a local http.server
+#
+# Usage:
+#   python check_crawler.py
+import http.server
+import sys
+import tempfile
+import threading
+
+from crawler import Crawler, PageCache
+
+TEXT = "Café… naïve — 日本"
+PAGES = {
+    # path: (Content-Type, body bytes)
+    "/no-charset": ("text/html", f"<html><title>{TEXT}</title><p>{TEXT}</p></html>".encode("utf-8")),
+    "/utf-8": ("text/html; charset=utf-8", f"<html><title>{TEXT}</title><p>{TEXT}</p></html>".encode("utf-8")),
+    "/latin-1": ("text/html; charset=ISO-8859-1", "<html><title>Café naïve</title></html>".encode("latin-1")),
+}
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        content_type, body = PAGES[self.path]
+        etag = f'"{len(body)}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def main():
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    with tempfile.TemporaryDirectory() as cache_dir:
+        crawler = Crawler(PageCache(cache_dir), rate=0)
+        failures = 0
+        for path, (content_type, body) in PAGES.items():
+            expected = body.decode(content_type.split("charset=")[-1] if "charset=" in content_type else "utf-8")
+            # The second pass is answered from the page cache
+            for _ in range(2):
+                result = crawler.fetch(base + path)
+                ok = result.html == expected
+                failures += not ok
+                print(f"{'ok  ' if ok else 'FAIL'} {path:<12} {'cached ' if result.from_cache else 'fetched'}: "
+                      f"{result.html[:50]!r}")
+    server.shutdown()
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
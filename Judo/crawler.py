@@ -0,0 +1,258 @@
+# Concurrent crawler for the BlackBeltWiki technique pages, with a revalidating on-disk cache
+#
+# Usage (from the Judo folder):
+#   python crawler.py [--csv data/judo_techniques_filtered.csv] [--workers 8] [--per-host 4] [--rate 5]
+#
+# The first crawl downloads every Move_Link page; later crawls send If-None-Match /
+# If-Modified-Since and only download pages that changed.
+import argparse
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".page_cache")
+CACHE_VERSION = 2
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8",
+}
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+@dataclass
+class CrawlResult:
+    url: str
+    status: int  # 0 when the request failed
+    html: str | None
+    from_cache: bool  # True for a 304 (or a network failure) answered from the cache
+    error: str | None = None
+
+
+def response_html(response):
+    """Decoded body of a response.
+
+    requests decodes text/* without a charset as ISO-8859-1, which garbles UTF-8 pages,
+    so a missing charset is detected from the content instead.
+    """
+    if "charset" not in response.headers.get("Content-Type", "").lower():
+        response.encoding = response.apparent_encoding
+    return response.text
+
+
+class PageCache:
+    """Fetched HTML plus its ETag/Last-Modified validators, one file pair per URL."""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, url):
+        # Versioned, so pages saved before charset detection are fetched again
+        return os.path.join(self.cache_dir, hashlib.sha256(f"{CACHE_VERSION}:{url}".encode("utf-8")).hexdigest())
+
+    def get(self, url):
+        """Return (validators, html) for a cached URL, or (None, None)."""
+        path = self._path(url)
+        try:
+            with open(path + ".json", encoding="utf-8") as f:
+                validators = json.load(f)
+            with open(path + ".html", encoding="utf-8") as f:
+                return validators, f.read()
+        except (OSError, ValueError):
+            return None, None
+
+    def put(self, url, validators, html):
+        path = self._path(url)
+        _write_atomic(path + ".html", html)
+        _write_atomic(path + ".json", json.dumps(validators))
+
+
+def _write_atomic(path, text):
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+class HostLimiter:
+    """At most `concurrency` requests in flight and `rate` request starts per second, per host."""
+
+    def __init__(self, concurrency, rate):
+        self.concurrency = concurrency
+        self.interval = 1.0 / rate if rate else 0.0
+        self._hosts = {}  # host -> [semaphore, next free start time]
+        self._lock = threading.Lock()
+
+    def _host(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = [threading.BoundedSemaphore(self.concurrency), 0.0]
+            return self._hosts[host]
+
+    def acquire(self, url):
+        state = self._host(url)
+        state[0].acquire()
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, state[1])
+            state[1] = slot + self.interval
+        time.sleep(max(0.0, slot - now))
+        return state[0]
+
+
+def retry_after(response, default):
+    """Seconds to wait from a Retry-After header (seconds or HTTP date), else default."""
+    value = response.headers.get("Retry-After") if response is not None else None
+    if not value:
+        return default
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return default
+
+
+class Crawler:
+    """Fetches many pages at once over one pooled session.
+
+    Each page is revalidated against the cache, retried with exponential backoff on
+    connection errors, 429 and 5xx, and never raises: failures come back as results
+    with an error. stats() reports throughput and the cache hit ratio of the last crawl.
+    """
+
+    def __init__(self, cache=None, max_workers=8, per_host=4, rate=5.0, retries=3, backoff=0.5,
+                 timeout=(5, 20), headers=None):
+        self.cache = cache if cache is not None else PageCache()
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.limiter = HostLimiter(per_host, rate)
+        self.session = requests.Session()
+        self.session.headers.update(headers or DEFAULT_HEADERS)
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, key, amount=1):
+        with self._stats_lock:
+            self._stats[key] = self._stats.get(key, 0) + amount
+
+    def _get(self, url, headers):
+        """GET with retries; returns the final response (which may be an error status)."""
+        for attempt in range(self.retries + 1):
+            response = None
+            try:
+                semaphore = self.limiter.acquire(url)
+                try:
+                    response = self.session.get(url, headers=headers, timeout=self.timeout)
+                finally:
+                    semaphore.release()
+                self._count("requests")
+                if response.status_code not in RETRY_STATUSES or attempt == self.retries:
+                    return response
+            except requests.RequestException:
+                self._count("requests")
+                if attempt == self.retries:
+                    raise
+            self._count("retries")
+            time.sleep(retry_after(response, self.backoff * 2 ** attempt * (0.5 + random.random())))
+
+    def fetch(self, url):
+        """Fetch one page, revalidating a cached copy when there is one."""
+        validators, cached_html = self.cache.get(url)
+        headers = {}
+        if validators:
+            if validators.get("etag"):
+                headers["If-None-Match"] = validators["etag"]
+            if validators.get("last_modified"):
+                headers["If-Modified-Since"] = validators["last_modified"]
+
+        try:
+            response = self._get(url, headers)
+        except requests.RequestException as e:
+            self._count("errors")
+            # Serve the last good copy if the site is unreachable
+            if cached_html is not None:
+                return CrawlResult(url, 0, cached_html, True, str(e))
+            return CrawlResult(url, 0, None, False, str(e))
+
+        if response.status_code == 304 and cached_html is not None:
+            self._count("cache_hits")
+            return CrawlResult(url, 304, cached_html, True)
+        if not response.ok:
+            self._count("errors")
+            return CrawlResult(url, response.status_code, None, False, response.reason)
+
+        self._count("downloaded")
+        self._count("bytes", len(response.content))
+        html = response_html(response)
+        new_validators = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+        if new_validators["etag"] or new_validators["last_modified"]:
+            self.cache.put(url, new_validators, html)
+        return CrawlResult(url, response.status_code, html, False)
+
+    def crawl(self, urls):
+        """Fetch URLs concurrently; results come back in the same order as urls."""
+        urls = list(urls)
+        with self._stats_lock:
+            self._stats = {"pages": len(urls)}
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = list(executor.map(self.fetch, urls))
+        self._count("seconds", time.perf_counter() - start)
+        return results
+
+    def stats(self):
+        """Counts for the last crawl, with pages/sec and cache hit ratio."""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        pages, seconds = stats.get("pages", 0), stats.get("seconds", 0.0)
+        stats["pages_per_sec"] = pages / seconds if seconds else 0.0
+        stats["hit_ratio"] = stats.get("cache_hits", 0) / pages if pages else 0.0
+        return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crawl the technique pages listed in the Judo CSV.")
+    parser.add_argument("--csv", default="data/judo_techniques_filtered.csv")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--per-host", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=5.0, help="request starts per second per host")
+    args = parser.parse_args()
+
+    urls = pd.read_csv(args.csv)["Move_Link"].dropna().drop_duplicates()
+    crawler = Crawler(PageCache(args.cache_dir), max_workers=args.workers, per_host=args.per_host, rate=args.rate)
+    results = crawler.crawl(urls)
+    stats = crawler.stats()
+    failed = [result for result in results if result.error and result.html is None]
+    print(f"{stats['pages']} pages in {stats['seconds']:.1f}s ({stats['pages_per_sec']:.1f} pages/sec): "
+          f"{stats.get('downloaded', 0)} downloaded ({stats.get('bytes', 0) / 1024 ** 2:.1f} MB), "
+          f"{stats.get('cache_hits', 0)} unchanged (hit ratio {stats['hit_ratio']:.0%}), "
+          f"{stats.get('retries', 0)} retries, {len(failed)} failed")
+    for result in failed:
+        print(f"  {result.url}: {result.error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@
 # Import the libraries
 import streamlit as st
 import pandas as pd
+from export import export_button
 
 # Set up the page config
 
@@ -40,14 +41,9 @@ st.header("Display the DataFrame as a JSON - st.json()")
 st.json(df.to_json(orient="records"), expanded=False)
 
 st.header("Display the DataFrame as a CSV - st.download_button()")
-csv = df.to_csv(index=False)
 st.dataframe(df)
-st.download_button(
-    label="Download data as CSV",
-    data=csv,
-    file_name='data.csv',
-    mime='text/csv',
-)
+# The file is built only when clicked (CSV, gzip CSV or Parquet) and cached per frame and format
+export_button(df, "data", key="data_export", label="Download data")
 
 st.markdown("#### Editable DataFrame - st.data_editor()")
 st.data_editor(df)
@@ -0,0 +1,99 @@
+# Exact and semantic answer cache for the RAG Q&A step
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+def normalize_query(query):
+    """Lower-case a query, collapse whitespace and drop trailing punctuation."""
+    return re.sub(r"\s+", " ", query).strip().rstrip("?!. ").lower()
+
+
+class AnswerCache:
+    """LRU + TTL cache of answers keyed by (index fingerprint, normalized query).
+
+    When embed_query and a semantic threshold are set (here or per get() call), a miss on
+    the exact key falls back to the cached query for the same index whose embedding has
+    the highest cosine similarity, if that similarity is at least the threshold.
+    """
+
+    def __init__(self, max_entries=256, ttl_seconds=3600, embed_query=None, semantic_threshold=None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.embed_query = embed_query
+        self.semantic_threshold = semantic_threshold
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # (fingerprint, query) -> (answer, created_at, unit vector)
+        self._lock = threading.Lock()
+
+    def _embed(self, query):
+        vector = np.asarray(self.embed_query(query), dtype="float32")
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _expired(self, created_at):
+        return self.ttl_seconds is not None and time.time() - created_at > self.ttl_seconds
+
+    def _semantic_lookup(self, fingerprint, vector, threshold):
+        best_key, best_score = None, -1.0
+        for key, (_, created_at, cached_vector) in self._entries.items():
+            if key[0] != fingerprint or cached_vector is None or self._expired(created_at):
+                continue
+            score = float(np.dot(vector, cached_vector))
+            if score > best_score:
+                best_key, best_score = key, score
+        if best_key is not None and best_score >= threshold:
+            return best_key
+        return None
+
+    def get(self, fingerprint, query, semantic_threshold=None):
+        """Return a cached answer or None."""
+        key = (fingerprint, normalize_query(query))
+        threshold = semantic_threshold if semantic_threshold is not None else self.semantic_threshold
+        semantic = self.embed_query is not None and threshold is not None
+        # Embed outside the lock; it is the slow part
+        vector = self._embed(key[1]) if semantic and key not in self._entries else None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry[1]):
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if vector is not None:
+                match = self._semantic_lookup(fingerprint, vector, threshold)
+                if match is not None:
+                    self._entries.move_to_end(match)
+                    self.semantic_hits += 1
+                    return self._entries[match][0]
+            self.misses += 1
+            return None
+
+    def put(self, fingerprint, query, answer):
+        """Store an answer, evicting the least recently used entry when full."""
+        key = (fingerprint, normalize_query(query))
+        vector = self._embed(key[1]) if self.embed_query is not None else None
+        with self._lock:
+            self._entries[key] = (answer, time.time(), vector)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        """Hit/miss counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.semantic_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.semantic_hits) / lookups if lookups else 0.0,
+            }
@@ -4,16 +4,15 @@ import os
 import faiss
 from io import BytesIO
 from docx import Document
-import numpy as np
 from langchain_community.document_loaders import WebBaseLoader
 from PyPDF2 import PdfReader
 from langchain.chains import RetrievalQA
 from langchain.text_splitter import CharacterTextSplitter
-from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain.vectorstores import FAISS
 from langchain_community.docstore.in_memory import InMemoryDocstore
 from langchain_huggingface import HuggingFaceEndpoint
 from dotenv import load_dotenv
+from embeddings import get_embedding_engine
 
 # st.page config
 st.set_page_config(page_title="40-Tech RAG Q&A App", page_icon="🤖")
@@ -79,20 +78,11 @@ def process_input(input_type, input_data):
     else:
         texts = text_splitter.split_text(documents)
         
-    # Create the embeddings
-    model_name = "sentence-transformers/all-mpnet-base-v2"
-    model_kwargs = {'device': 'cpu'}
-    encode_kwargs = {'normalize_embeddings': False}
-    
-    hf_embeddings = HuggingFaceEmbeddings(
-        model_name=model_name,
-        model_kwargs=model_kwargs,
-        encode_kwargs=encode_kwargs
-    )
+    # Get the shared embedding engine (loaded once per server process)
+    hf_embeddings = get_embedding_engine("sentence-transformers/all-mpnet-base-v2")
+
     # Create FAISS index
-    sample_embedding = np.array(hf_embeddings.embed_query("sample text"))
-    dimension = sample_embedding.shape[0]
-    index = faiss.IndexFlatL2(dimension)
+    index = faiss.IndexFlatL2(hf_embeddings.dimension)
     
     # Create FAISS vector store with the embedding function
     vector_store = FAISS(
@@ -0,0 +1,93 @@
+# Benchmark the vector index types: recall@k against Flat, query latency and memory
+#
+# Usage:
+#   python bench_index.py --sizes 10000 100000 1000000 --dim 768 --k 4
+import argparse
+import time
+
+import faiss
+import numpy as np
+
+from vector_index import INDEX_TYPES, build_trained_index, create_index, tune_index
+
+
+def synthetic_corpus(n_vectors, dimension, seed=0):
+    """Clustered Gaussian vectors, closer to real embeddings than uniform noise."""
+    rng = np.random.default_rng(seed)
+    n_clusters = max(1, n_vectors // 1000)
+    centers = rng.normal(size=(n_clusters, dimension)).astype("float32")
+    labels = rng.integers(0, n_clusters, size=n_vectors)
+    vectors = centers[labels] + 0.3 * rng.normal(size=(n_vectors, dimension)).astype("float32")
+    return np.ascontiguousarray(vectors, dtype="float32")
+
+
+def build(index_type, vectors):
+    """Build an index the same way process_input does."""
+    if index_type in ("IVF-Flat", "IVF-PQ"):
+        return build_trained_index(index_type, vectors)
+    index = create_index(index_type, vectors.shape[1])
+    index.add(vectors)
+    return index
+
+
+def index_bytes(index):
+    return faiss.serialize_index(index).nbytes
+
+
+def run(n_vectors, dimension, n_queries, k, nprobe, ef_search):
+    vectors = synthetic_corpus(n_vectors, dimension)
+    queries = synthetic_corpus(n_queries, dimension, seed=1)
+
+    baseline = None
+    rows = []
+    for index_type in INDEX_TYPES:
+        start = time.perf_counter()
+        index = build(index_type, vectors)
+        build_seconds = time.perf_counter() - start
+        if index is None:
+            rows.append((index_type, None))
+            continue
+        tune_index(index, nprobe=nprobe, ef_search=ef_search)
+
+        # One query at a time, like a user asking a question
+        latencies = []
+        results = np.empty((n_queries, k), dtype="int64")
+        for i in range(n_queries):
+            start = time.perf_counter()
+            _, ids = index.search(queries[i:i + 1], k)
+            latencies.append(time.perf_counter() - start)
+            results[i] = ids[0]
+
+        if baseline is None:
+            baseline = results
+        recall = np.mean([len(set(results[i]) & set(baseline[i])) / k for i in range(n_queries)])
+        latencies_ms = np.array(latencies) * 1000
+        rows.append((index_type, (recall, np.percentile(latencies_ms, 50), np.percentile(latencies_ms, 99),
+                                  index_bytes(index) / 1024 ** 2, build_seconds)))
+
+    print(f"\n{n_vectors:,} vectors x {dimension} dims, {n_queries} queries, k={k}")
+    print(f"{'index':<10}{'recall@k':>10}{'p50 ms':>10}{'p99 ms':>10}{'MB':>10}{'build s':>10}")
+    for index_type, stats in rows:
+        if stats is None:
+            print(f"{index_type:<10}{'too few vectors to train':>50}")
+            continue
+        recall, p50, p99, mb, build_seconds = stats
+        print(f"{index_type:<10}{recall:>10.3f}{p50:>10.3f}{p99:>10.3f}{mb:>10.1f}{build_seconds:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare FAISS index types on synthetic corpora.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--nprobe", type=int, default=16)
+    parser.add_argument("--ef-search", type=int, default=64)
+    args = parser.parse_args()
+
+    for n_vectors in args.sizes:
+        run(n_vectors, args.dim, args.queries, args.k, args.nprobe, args.ef_search)
+
+
+if __name__ == "__main__":
+    main()
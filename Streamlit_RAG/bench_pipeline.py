@@ -0,0 +1,140 @@
+# Offline benchmark of the RAG pipeline on bundled sample documents with a stubbed LLM
+#
+# Usage:
+#   python bench_pipeline.py                               # Jujutsu sample, real embedding model
+#   python bench_pipeline.py --fake-embeddings --scale 500  # fully offline, no model download
+#   python bench_pipeline.py --format prometheus > timings.prom
+import argparse
+import csv
+import hashlib
+import os
+import sys
+import time
+
+import numpy as np
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from langchain_core.embeddings import Embeddings
+
+from ingest import add_in_batches, iter_chunks
+from timing import Timings, prometheus_text
+from vector_index import INDEX_TYPES, create_index, train_index
+
+SAMPLE_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..",
+                          "Jujutsu_Source", "data", "cleaned_extracted_text.csv")
+QUERIES = [
+    "How do you defend against a rear choke?",
+    "What is the history of Gracie Jiu-Jitsu?",
+    "How do you escape a bear hug from behind?",
+    "What is the guard position?",
+]
+
+
+class HashingEmbeddings(Embeddings):
+    """Deterministic bag-of-words hashing embeddings, for runs without the model."""
+
+    def __init__(self, dimension=384):
+        self.dimension = dimension
+
+    def embed_documents(self, texts):
+        vectors = np.zeros((len(texts), self.dimension), dtype="float32")
+        for row, text in enumerate(texts):
+            for word in text.lower().split():
+                bucket = int(hashlib.md5(word.encode("utf-8")).hexdigest()[:8], 16) % self.dimension
+                vectors[row, bucket] += 1.0
+        return vectors.tolist()
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+class StubLLM:
+    """Stands in for the endpoint: fixed latency, echoes the prompt size."""
+
+    def __init__(self, latency=0.05):
+        self.latency = latency
+
+    def invoke(self, prompt):
+        time.sleep(self.latency)
+        return f"Stub answer for a {len(prompt)}-character prompt."
+
+
+def iter_pages(path, scale=1, column="content"):
+    """Yield page texts from the sample CSV, one row at a time, repeating the file scale times."""
+    csv.field_size_limit(sys.maxsize)
+    first = True
+    for copy in range(scale):
+        with open(path, encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f):
+                # Tag each copy so repeated pages are distinct chunks, as in a real library
+                text = f"[copy {copy}] " + (row.get(column) or "")
+                yield text if first else "\n\n" + text
+                first = False
+
+
+def run(args, embeddings, repeat):
+    timings = Timings(run=f"repeat-{repeat}")
+    vector_store = FAISS(
+        embedding_function=embeddings,
+        index=create_index(args.index_type, embeddings.dimension),
+        docstore=InMemoryDocstore(),
+        index_to_docstore_id={},
+    )
+
+    pages = timings.iter("load", iter_pages(args.csv, args.scale), unit="pages")
+    texts = timings.iter("split", iter_chunks(pages, chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap),
+                         unit="chunks")
+    add_in_batches(vector_store, texts, batch_size=args.batch_size, timings=timings)
+    with timings.span("train", unit="vectors") as counts:
+        if train_index(vector_store, args.index_type):
+            counts["items"] = vector_store.index.ntotal
+
+    llm = StubLLM(args.llm_latency)
+    for query in QUERIES:
+        with timings.span("retrieval", unit="documents") as counts:
+            sources = vector_store.similarity_search(query, k=4)
+            counts["items"] = len(sources)
+        with timings.span("llm", unit="characters") as counts:
+            context = "\n\n".join(doc.page_content for doc in sources)
+            counts["items"] = len(llm.invoke(f"{context}\n\nQuestion: {query}"))
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time each RAG pipeline stage on sample documents.")
+    parser.add_argument("--csv", default=SAMPLE_CSV)
+    parser.add_argument("--scale", type=int, default=50, help="times to repeat the sample document")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--chunk-overlap", type=int, default=100)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--index-type", choices=INDEX_TYPES, default="Flat")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="seconds per stub LLM call")
+    parser.add_argument("--fake-embeddings", action="store_true", help="use hashing embeddings instead of the model")
+    parser.add_argument("--format", choices=["table", "jsonl", "prometheus"], default="table")
+    args = parser.parse_args()
+
+    if args.fake_embeddings:
+        embeddings = HashingEmbeddings()
+    else:
+        from embeddings import get_embedding_engine
+        embeddings = get_embedding_engine()
+
+    runs = []
+    for repeat in range(args.repeat):
+        timings = run(args, embeddings, repeat)
+        runs.append(timings)
+        if args.format == "jsonl":
+            sys.stdout.write(timings.to_jsonl())
+        elif args.format == "table":
+            print(f"\nRun {repeat + 1}/{args.repeat}")
+            print(f"{'stage':<12}{'seconds':>10}{'items':>10}{'unit':>12}{'per sec':>12}{'MB':>8}")
+            for row in timings.rows():
+                print(f"{row['stage']:<12}{row['seconds']:>10.3f}{row['items']:>10}{row['unit']:>12}"
+                      f"{row['per_sec']:>12.1f}{row['bytes'] / 1024 ** 2:>8.2f}")
+    if args.format == "prometheus":
+        sys.stdout.write(prometheus_text(runs, "rag_bench"))
+
+
+if __name__ == "__main__":
+    main()
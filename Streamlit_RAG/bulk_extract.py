@@ -0,0 +1,114 @@
+# Parallel text extraction for bulk uploads of PDF, DOCX and TXT files
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from docx import Document
+from langchain_core.documents import Document as LCDocument
+from PyPDF2 import PdfReader
+
+FILE_TYPES = {".pdf": "PDF", ".docx": "DOCX", ".txt": "TXT"}
+TASKS_PER_WORKER = 2  # a few page ranges per worker balance uneven pages; each task reopens the PDF
+
+
+def file_type_of(name):
+    """PDF, DOCX or TXT from a file name."""
+    extension = os.path.splitext(name)[1].lower()
+    if extension not in FILE_TYPES:
+        raise ValueError(f"Unsupported file type: {name}")
+    return FILE_TYPES[extension]
+
+
+def available_cores():
+    """CPU cores this process may run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def create_pool(max_workers=None):
+    """Process pool sized to the available cores.
+
+    Uses spawn so workers never inherit the Streamlit server's threads and locks.
+    """
+    return ProcessPoolExecutor(max_workers=max_workers or available_cores(), mp_context=get_context("spawn"))
+
+
+def _extract_pages(path, start, stop):
+    """Worker: text of PDF pages [start, stop)."""
+    pdf_reader = PdfReader(path)
+    return "".join(pdf_reader.pages[i].extract_text() or "" for i in range(start, stop))
+
+
+def _extract_whole(path, file_type):
+    """Worker: text of a whole DOCX or TXT file."""
+    if file_type == "DOCX":
+        return "\n".join(para.text for para in Document(path).paragraphs)
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def _plan(paths, workers):
+    """Split files into tasks: PDFs by page range, other files whole."""
+    tasks = []  # (file position, function, args, pages)
+    for position, (path, file_type) in enumerate(paths):
+        if file_type != "PDF":
+            tasks.append((position, _extract_whole, (path, file_type), 1))
+            continue
+        n_pages = len(PdfReader(path).pages)
+        step = max(1, -(-n_pages // (workers * TASKS_PER_WORKER)))
+        for start in range(0, n_pages, step):
+            stop = min(start + step, n_pages)
+            tasks.append((position, _extract_pages, (path, start, stop), stop - start))
+    return tasks
+
+
+def extract_paths(paths, executor=None, workers=None):
+    """Extract the text of (path, file type) pairs on a process pool.
+
+    Results are merged in input order (and page order within a file), so the output,
+    and therefore the chunks, are the same on every run. Returns (texts, pages).
+    """
+    workers = workers or available_cores()
+    own_executor = executor is None
+    executor = executor or create_pool(workers)
+    try:
+        tasks = _plan(paths, workers)
+        futures = [executor.submit(function, *args) for _, function, args, _ in tasks]
+        texts = [[] for _ in paths]
+        for (position, _, _, _), future in zip(tasks, futures):
+            texts[position].append(future.result())
+        return ["".join(parts) for parts in texts], sum(pages for *_, pages in tasks)
+    finally:
+        if own_executor:
+            executor.shutdown()
+
+
+def extract_paths_serial(paths):
+    """Single-process baseline: extract every page in order on the calling thread."""
+    texts = []
+    pages = 0
+    for path, file_type in paths:
+        if file_type == "PDF":
+            n_pages = len(PdfReader(path).pages)
+            texts.append(_extract_pages(path, 0, n_pages))
+            pages += n_pages
+        else:
+            texts.append(_extract_whole(path, file_type))
+            pages += 1
+    return texts, pages
+
+
+def load_documents(files, executor=None):
+    """Extract uploaded files in parallel and return one LangChain document per file."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        paths = []
+        for i, file in enumerate(files):
+            # Workers read from disk, so the upload bytes are not pickled to every task
+            path = os.path.join(tmp_dir, f"{i}{os.path.splitext(file.name)[1]}")
+            with open(path, "wb") as f:
+                f.write(file.getvalue())
+            paths.append((path, file_type_of(file.name)))
+        texts, _ = extract_paths(paths, executor=executor)
+    return [LCDocument(page_content=text, metadata={"source": file.name}) for file, text in zip(files, texts)]
@@ -0,0 +1,311 @@
+# Persistent multi-source corpus on top of a FAISS vector store
+import hashlib
+import json
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+
+import faiss
+import numpy as np
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+
+DEFAULT_CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".corpus")
+SHARD_SIZE = 1024  # new chunks embedded, added and saved per step
+VERSION_FILE = "version.json"
+LEGACY_MANIFEST_FILE = "manifest.json"  # single-file layout, migrated on load
+
+
+def chunk_id(text):
+    """Content hash of a chunk, used as its docstore id so duplicates share one vector."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _write_json(path, data):
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(path + ".tmp", path)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class ReadWriteLock:
+    """Any number of readers or one writer; a waiting writer holds off new readers."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._readers = 0
+        self._writing = False
+        self._writers_waiting = 0
+
+    @contextmanager
+    def read(self):
+        with self._cond:
+            while self._writing or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self._cond:
+            self._writers_waiting += 1
+            while self._writing or self._readers:
+                self._cond.wait()
+            self._writers_waiting -= 1
+            self._writing = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writing = False
+                self._cond.notify_all()
+
+
+class SharedFAISS(FAISS):
+    """FAISS store whose searches hold the read side of a lock.
+
+    FAISS does not support adding or removing vectors while searching, so writers
+    change the index and docstore only under lock.write().
+    """
+
+    def __init__(self, *args, lock, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lock = lock
+
+    def similarity_search_with_score_by_vector(self, *args, **kwargs):
+        with self.lock.read():
+            return super().similarity_search_with_score_by_vector(*args, **kwargs)
+
+    def max_marginal_relevance_search_with_score_by_vector(self, *args, **kwargs):
+        with self.lock.read():
+            return super().max_marginal_relevance_search_with_score_by_vector(*args, **kwargs)
+
+
+class Corpus:
+    """A FAISS store that sources can be added to and removed from one at a time.
+
+    Each chunk is stored under its content hash, and each source's record lists the
+    chunks it references. Adding a source embeds only chunks that are not indexed yet;
+    removing a source deletes only chunks no other source still uses. Uses a flat index,
+    since FAISS cannot remove vectors from HNSW.
+
+    On disk, every add writes its new vectors as shards (one .npy of vectors plus one
+    .json of ids and texts) and one small source record, so saving costs as much as the
+    new data, not the whole corpus. The index is rebuilt from the shards on load.
+
+    vector_store can be searched from any session while sources are added or removed:
+    searches and list_sources() share a read lock, and changes to the index, docstore
+    and sources take it exclusively, while embedding happens outside it.
+    """
+
+    def __init__(self, embeddings, path=None):
+        self.path = path or os.getenv("RAG_CORPUS_DIR", DEFAULT_CORPUS_DIR)
+        self.embeddings = embeddings
+        self._lock = threading.Lock()  # one add/remove at a time
+        self._search_lock = ReadWriteLock()
+        self._sources_dir = os.path.join(self.path, "sources")
+        self._shards_dir = os.path.join(self.path, "shards")
+        os.makedirs(self._sources_dir, exist_ok=True)
+        os.makedirs(self._shards_dir, exist_ok=True)
+        self.vector_store = SharedFAISS(
+            embedding_function=embeddings,
+            index=faiss.IndexFlatL2(embeddings.dimension),
+            docstore=InMemoryDocstore(),
+            index_to_docstore_id={},
+            lock=self._search_lock,
+        )
+        if os.path.exists(os.path.join(self.path, LEGACY_MANIFEST_FILE)):
+            self._migrate()
+        self._load()
+
+    @property
+    def fingerprint(self):
+        """Changes every time the corpus content changes."""
+        return f"corpus:{self.path}:{self.version}"
+
+    def list_sources(self):
+        """Snapshot of (source id, name, chunk count) for every source.
+
+        Safe to iterate while other sessions add or remove sources.
+        """
+        with self._search_lock.read():
+            return [(source_id, source["name"], len(source["chunks"])) for source_id, source in self.sources.items()]
+
+    def _source_path(self, source_id):
+        return os.path.join(self._sources_dir, hashlib.sha256(source_id.encode("utf-8")).hexdigest() + ".json")
+
+    def _shard_path(self, shard):
+        return os.path.join(self._shards_dir, shard)
+
+    def _load(self):
+        try:
+            with open(os.path.join(self.path, VERSION_FILE), encoding="utf-8") as f:
+                self.version = json.load(f)["version"]
+        except (OSError, ValueError, KeyError):
+            self.version = 0
+        self.sources = {}  # source id -> {"name": ..., "chunks": [chunk ids]}
+        self._refs = {}  # chunk id -> number of sources using it
+        for file_name in os.listdir(self._sources_dir):
+            if not file_name.endswith(".json"):
+                continue
+            with open(os.path.join(self._sources_dir, file_name), encoding="utf-8") as f:
+                record = json.load(f)
+            self.sources[record["id"]] = {"name": record["name"], "chunks": record["chunks"]}
+            for cid in record["chunks"]:
+                self._refs[cid] = self._refs.get(cid, 0) + 1
+
+        # Each live chunk comes from the first shard holding it; shards with no live
+        # chunks (left by removed sources or an interrupted add) are deleted
+        self._chunk_shard = {}  # chunk id -> shard holding its vector
+        self._shards = {}  # shard -> chunk ids it provides
+        for file_name in sorted(os.listdir(self._shards_dir)):
+            shard, ext = os.path.splitext(file_name)
+            if ext == ".tmp":
+                _remove(os.path.join(self._shards_dir, file_name))
+            if ext != ".json":
+                continue
+            try:
+                with open(self._shard_path(shard) + ".json", encoding="utf-8") as f:
+                    data = json.load(f)
+                vectors = np.load(self._shard_path(shard) + ".npy")
+            except (OSError, ValueError):
+                self._delete_shard(shard)
+                continue
+            provided = [i for i, cid in enumerate(data["ids"]) if cid in self._refs and cid not in self._chunk_shard]
+            if not provided:
+                self._delete_shard(shard)
+                continue
+            ids = [data["ids"][i] for i in provided]
+            self._shards[shard] = set(ids)
+            self._chunk_shard.update((cid, shard) for cid in ids)
+            self.vector_store.add_embeddings(zip([data["texts"][i] for i in provided], vectors[provided]),
+                                             metadatas=[{"source": data["source"]}] * len(ids), ids=ids)
+
+    def _migrate(self):
+        """Split a corpus saved as one FAISS index plus manifest into shards and source records."""
+        legacy = FAISS.load_local(self.path, self.embeddings, allow_dangerous_deserialization=True)
+        with open(os.path.join(self.path, LEGACY_MANIFEST_FILE), encoding="utf-8") as f:
+            manifest = json.load(f)
+        ids = [legacy.index_to_docstore_id[i] for i in range(legacy.index.ntotal)]
+        texts = [legacy.docstore.search(cid).page_content for cid in ids]
+        if ids:
+            self._write_shard(ids, texts, legacy.index.reconstruct_n(0, len(ids)), "corpus")
+        for source_id, source in manifest["sources"].items():
+            _write_json(self._source_path(source_id), {"id": source_id, **source})
+        _write_json(os.path.join(self.path, VERSION_FILE), {"version": manifest["version"]})
+        for file_name in (LEGACY_MANIFEST_FILE, "index.faiss", "index.pkl"):
+            _remove(os.path.join(self.path, file_name))
+
+    def _write_shard(self, ids, texts, vectors, source):
+        shard = uuid.uuid4().hex
+        path = self._shard_path(shard)
+        # The vectors go first: the loader ignores a shard until its .json exists
+        with open(path + ".npy.tmp", "wb") as f:
+            np.save(f, np.asarray(vectors, dtype="float32"))
+        os.replace(path + ".npy.tmp", path + ".npy")
+        _write_json(path + ".json", {"source": source, "ids": ids, "texts": texts})
+        return shard
+
+    def _delete_shard(self, shard):
+        _remove(self._shard_path(shard) + ".json")
+        _remove(self._shard_path(shard) + ".npy")
+
+    def _bump_version(self):
+        self.version += 1
+        _write_json(os.path.join(self.path, VERSION_FILE), {"version": self.version})
+
+    def add_source(self, source_id, name, texts, batch_size=SHARD_SIZE):
+        """Add a source's chunks, embedding only chunks not already in the corpus.
+
+        Returns the number of new vectors added.
+        """
+        with self._lock:
+            if source_id in self.sources:
+                return 0
+            chunk_ids, batch, batch_ids, added_ids, shards = [], [], [], [], {}
+            seen = set()
+            try:
+                for text in texts:
+                    cid = chunk_id(text)
+                    if cid in seen:
+                        continue
+                    seen.add(cid)
+                    chunk_ids.append(cid)
+                    if cid in self._refs:
+                        continue
+                    batch.append(text)
+                    batch_ids.append(cid)
+                    if len(batch) >= batch_size:
+                        self._add_batch(name, batch, batch_ids, added_ids, shards)
+                        batch, batch_ids = [], []
+                if batch:
+                    self._add_batch(name, batch, batch_ids, added_ids, shards)
+                _write_json(self._source_path(source_id), {"id": source_id, "name": name, "chunks": chunk_ids})
+            except BaseException:
+                # Drop the batches already added, so a retry of this source starts clean
+                if added_ids:
+                    with self._search_lock.write():
+                        self.vector_store.delete(added_ids)
+                for shard in shards:
+                    self._delete_shard(shard)
+                raise
+
+            for cid in chunk_ids:
+                self._refs[cid] = self._refs.get(cid, 0) + 1
+            for shard, ids in shards.items():
+                self._shards[shard] = set(ids)
+                self._chunk_shard.update((cid, shard) for cid in ids)
+            with self._search_lock.write():
+                self.sources[source_id] = {"name": name, "chunks": chunk_ids}
+            self._bump_version()
+            return len(added_ids)
+
+    def _add_batch(self, name, batch, batch_ids, added_ids, shards):
+        """Embed a batch, save it as a shard and add it to the store."""
+        vectors = self.embeddings.embed_documents(batch)
+        shard = self._write_shard(batch_ids, batch, vectors, name)
+        shards[shard] = batch_ids
+        with self._search_lock.write():
+            self.vector_store.add_embeddings(zip(batch, vectors), metadatas=[{"source": name}] * len(batch),
+                                             ids=batch_ids)
+        added_ids.extend(batch_ids)
+
+    def remove_source(self, source_id):
+        """Remove a source and delete the vectors no other source uses. Returns the number deleted."""
+        with self._lock:
+            source = self.sources.get(source_id)
+            if source is None:
+                return 0
+            orphans = []
+            for cid in source["chunks"]:
+                self._refs[cid] -= 1
+                if self._refs[cid] == 0:
+                    del self._refs[cid]
+                    orphans.append(cid)
+            with self._search_lock.write():
+                del self.sources[source_id]
+                if orphans:
+                    self.vector_store.delete(orphans)
+            _remove(self._source_path(source_id))
+            # A shard is deleted once none of its chunks are in use
+            for cid in orphans:
+                shard = self._chunk_shard.pop(cid)
+                self._shards[shard].discard(cid)
+                if not self._shards[shard]:
+                    del self._shards[shard]
+                    self._delete_shard(shard)
+            self._bump_version()
+            return len(orphans)
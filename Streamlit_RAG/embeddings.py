@@ -0,0 +1,66 @@
+# Shared sentence-transformers embedding engine for the RAG apps
+import os
+import threading
+
+import torch
+from langchain_core.embeddings import Embeddings
+from sentence_transformers import SentenceTransformer
+
+# Defaults (override with environment variables)
+DEFAULT_MODEL = "sentence-transformers/all-mpnet-base-v2"
+DEFAULT_BATCH_SIZE = int(os.getenv("RAG_EMBED_BATCH_SIZE", "32"))
+DEFAULT_NUM_THREADS = int(os.getenv("RAG_EMBED_THREADS", "0"))  # 0 keeps the torch default
+
+
+class EmbeddingEngine(Embeddings):
+    """Loads a sentence-transformers model once and encodes texts in batches.
+
+    Calls are serialized with a lock, so concurrent sessions queue onto the same
+    model instead of each loading their own copy.
+    """
+
+    def __init__(self, model_name=DEFAULT_MODEL, device=None, batch_size=DEFAULT_BATCH_SIZE,
+                 num_threads=DEFAULT_NUM_THREADS, normalize_embeddings=False):
+        if num_threads:
+            torch.set_num_threads(num_threads)
+        self.model_name = model_name
+        self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+        self.batch_size = batch_size
+        self.normalize_embeddings = normalize_embeddings
+        self.model = SentenceTransformer(model_name, device=self.device)
+        self._lock = threading.Lock()
+
+    @property
+    def dimension(self):
+        """Vector size read from the model metadata."""
+        return self.model.get_sentence_embedding_dimension()
+
+    def embed_documents(self, texts):
+        """Encode a list of texts in batches of batch_size."""
+        if not texts:
+            return []
+        with self._lock:
+            vectors = self.model.encode(
+                list(texts),
+                batch_size=self.batch_size,
+                convert_to_numpy=True,
+                normalize_embeddings=self.normalize_embeddings,
+                show_progress_bar=False,
+            )
+        return vectors.tolist()
+
+    def embed_query(self, text):
+        """Encode a single query."""
+        return self.embed_documents([text])[0]
+
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def get_embedding_engine(model_name=DEFAULT_MODEL):
+    """Return the process-wide engine for a model, loading it on first use."""
+    with _engines_lock:
+        if model_name not in _engines:
+            _engines[model_name] = EmbeddingEngine(model_name)
+        return _engines[model_name]
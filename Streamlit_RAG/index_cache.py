@@ -0,0 +1,107 @@
+# On-disk FAISS index cache shared by every session of the RAG app
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from langchain_community.vectorstores import FAISS
+
+# Cache location and size budget (override with environment variables)
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".index_cache")
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3  # 2 GB
+
+
+def cache_key(source_bytes, *settings):
+    """Build a content-addressed key from the source bytes and the pipeline settings."""
+    digest = hashlib.sha256(source_bytes)
+    for setting in settings:
+        digest.update(b"\0")
+        digest.update(str(setting).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def file_digest(file, block_size=1024 * 1024):
+    """SHA-256 of a seekable file object, read block by block and rewound afterwards."""
+    file.seek(0)
+    digest = hashlib.sha256()
+    for block in iter(lambda: file.read(block_size), b""):
+        digest.update(block)
+    file.seek(0)
+    return digest.digest()
+
+
+def _dir_size(path):
+    """Total size in bytes of the files under a directory."""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+class IndexCache:
+    """Stores saved FAISS vector stores in one folder per key, evicting least recently used."""
+
+    def __init__(self, cache_dir=None, max_bytes=None):
+        self.cache_dir = cache_dir or os.getenv("RAG_INDEX_CACHE_DIR", DEFAULT_CACHE_DIR)
+        self.max_bytes = int(max_bytes or os.getenv("RAG_INDEX_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def load(self, key, embeddings):
+        """Return the cached vector store for a key, or None if it has not been seen."""
+        path = self._path(key)
+        if not os.path.isdir(path):
+            return None
+        try:
+            vector_store = FAISS.load_local(path, embeddings, allow_dangerous_deserialization=True)
+        except Exception:
+            # A partial or corrupt entry is dropped and rebuilt by the caller
+            shutil.rmtree(path, ignore_errors=True)
+            return None
+        # Touch the entry so eviction treats it as recently used
+        now = time.time()
+        os.utime(path, (now, now))
+        return vector_store
+
+    def save(self, key, vector_store):
+        """Save a vector store under a key, then evict old entries above the size budget."""
+        path = self._path(key)
+        # Write into a temp folder first so other sessions never see a half-written index
+        tmp_path = tempfile.mkdtemp(prefix=".tmp-", dir=self.cache_dir)
+        try:
+            vector_store.save_local(tmp_path)
+            try:
+                os.replace(tmp_path, path)
+            except OSError:
+                # Another session saved the same key first; keep theirs
+                shutil.rmtree(tmp_path, ignore_errors=True)
+        except Exception:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            raise
+        self.evict()
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes."""
+        with self._lock:
+            entries = []
+            for name in os.listdir(self.cache_dir):
+                path = self._path(name)
+                if name.startswith(".tmp-") or not os.path.isdir(path):
+                    continue
+                entries.append((os.path.getmtime(path), _dir_size(path), path))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                shutil.rmtree(path, ignore_errors=True)
+                total -= size
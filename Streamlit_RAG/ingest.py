@@ -0,0 +1,113 @@
+# Streaming, bounded-memory ingestion of uploaded files into a vector store
+import codecs
+
+from docx import Document
+from PyPDF2 import PdfReader
+from langchain.text_splitter import CharacterTextSplitter
+
+from timing import Timings
+
+TXT_BLOCK_SIZE = 64 * 1024  # bytes read per step from a TXT upload
+ADD_BATCH_SIZE = 64  # chunks embedded and added to the index per step
+
+
+def _file_size(file):
+    """Size of a seekable file object, leaving it rewound."""
+    file.seek(0, 2)
+    size = file.tell()
+    file.seek(0)
+    return size
+
+
+def iter_file_segments(file, file_type, on_progress=None):
+    """Yield the text of a file piece by piece: PDF pages, DOCX paragraphs or TXT blocks.
+
+    on_progress(done, total) is called after each piece so the UI can show a progress bar.
+    """
+    file.seek(0)
+    if file_type == "PDF":
+        # PdfReader reads pages lazily from the stream, so only one page of text is held at a time
+        pdf_reader = PdfReader(file)
+        total = len(pdf_reader.pages)
+        for i, page in enumerate(pdf_reader.pages):
+            yield page.extract_text() or ""
+            if on_progress:
+                on_progress(i + 1, total)
+    elif file_type == "DOCX":
+        # python-docx parses the document XML up front; paragraphs are then handed out one by one
+        paragraphs = Document(file).paragraphs
+        total = len(paragraphs)
+        for i, para in enumerate(paragraphs):
+            yield para.text if i == 0 else "\n" + para.text
+            if on_progress:
+                on_progress(i + 1, total)
+    elif file_type == "TXT":
+        total = _file_size(file)
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        done = 0
+        while True:
+            block = file.read(TXT_BLOCK_SIZE)
+            if not block:
+                break
+            done += len(block)
+            yield decoder.decode(block)
+            if on_progress:
+                on_progress(done, total)
+        yield decoder.decode(b"", final=True)
+    else:
+        raise ValueError(f"Unsupported file type: {file_type}")
+
+
+def iter_chunks(segments, chunk_size=1000, chunk_overlap=100):
+    """Split a stream of text segments into chunks, carrying the overlap across segment boundaries.
+
+    Only the unfinished tail of the text is buffered, so memory stays around a few chunks
+    no matter how long the document is.
+    """
+    text_splitter = CharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    buffer = ""
+    for segment in segments:
+        buffer += segment
+        if len(buffer) < 2 * chunk_size:
+            continue
+        chunks = text_splitter.split_text(buffer)
+        if len(chunks) < 2:
+            # No separator yet; emit oversized text rather than growing the buffer forever
+            if len(buffer) > 8 * chunk_size:
+                yield from chunks
+                buffer = ""
+            continue
+        # The last chunk may still grow with the next segment, and it already starts
+        # with the overlap from the chunk before it, so it becomes the new buffer
+        yield from chunks[:-1]
+        buffer = chunks[-1]
+    if buffer:
+        yield from text_splitter.split_text(buffer)
+
+
+def _add_batch(vector_store, batch, timings):
+    """Embed a batch and add it to the index, timing the two steps separately."""
+    with timings.span("embed", unit="vectors") as counts:
+        vectors = vector_store.embedding_function.embed_documents(batch)
+        counts["items"] = len(batch)
+        counts["bytes"] = sum(len(text.encode("utf-8")) for text in batch)
+    with timings.span("faiss_add", unit="vectors") as counts:
+        vector_store.add_embeddings(list(zip(batch, vectors)))
+        counts["items"] = len(batch)
+
+
+def add_in_batches(vector_store, texts, batch_size=ADD_BATCH_SIZE, timings=None):
+    """Embed and add an iterable of texts to the vector store batch_size chunks at a time."""
+    timings = timings or Timings()
+    batch = []
+    added = 0
+    for text in texts:
+        batch.append(text)
+        if len(batch) >= batch_size:
+            _add_batch(vector_store, batch, timings)
+            added += len(batch)
+            batch = []
+    if batch:
+        _add_batch(vector_store, batch, timings)
+        added += len(batch)
+    return added
@@ -1,20 +1,27 @@
 # Import the libraries
 import streamlit as st
 import os
+import time
 import faiss
 from io import BytesIO
 from docx import Document
-import numpy as np
-import torch
-from langchain_community.document_loaders import WebBaseLoader
 from PyPDF2 import PdfReader
-from langchain.chains import RetrievalQA
+from langchain.chains.question_answering import load_qa_chain
+from langchain.chains.retrieval_qa.prompt import PROMPT
 from langchain.text_splitter import CharacterTextSplitter
-from langchain_huggingface import HuggingFaceEmbeddings
 from langchain.vectorstores import FAISS
 from langchain_community.docstore.in_memory import InMemoryDocstore
 from langchain_huggingface import HuggingFaceEndpoint
 from dotenv import load_dotenv
+from answer_cache import AnswerCache
+from bulk_extract import create_pool, load_documents as load_bulk_documents
+from corpus import Corpus
+from embeddings import get_embedding_engine
+from timing import Timings, prometheus_text
+from index_cache import IndexCache, cache_key, file_digest
+from ingest import add_in_batches, iter_chunks, iter_file_segments
+from vector_index import DEFAULT_EF_SEARCH, DEFAULT_NPROBE, INDEX_TYPES, create_index, train_index, tune_index
+from web_fetch import WebFetcher
 
 # Streamlit page config
 st.set_page_config(page_title="40-Tech RAG Q&A App", page_icon="🤖")
@@ -22,13 +29,61 @@ st.set_page_config(page_title="40-Tech RAG Q&A App", page_icon="🤖")
 # Load environment variables
 load_dotenv()
 HUGGING_FACE_API = os.getenv("HUGGING_FACE_API")
+HF_ENDPOINT_URL = os.getenv("HF_ENDPOINT_URL")  # optional, e.g. a local text-generation server
 
 # Validate the Hugging Face API key
 if not HUGGING_FACE_API:
     st.error("Hugging Face API key not found. Please set it in the environment variables.")
     st.stop()
 
+# Pipeline settings (part of the index cache key)
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 100
+EMBEDDING_MODEL = "sentence-transformers/all-mpnet-base-v2"
+LLM_REPO_ID = "meta-llama/Meta-Llama-3-8B-Instruct"
+
 # Helper functions
+@st.cache_resource
+def get_index_cache():
+    """One on-disk index cache shared by all sessions of this server."""
+    return IndexCache()
+
+@st.cache_resource
+def get_llm():
+    """One LLM client shared by all sessions."""
+    if HF_ENDPOINT_URL:
+        return HuggingFaceEndpoint(endpoint_url=HF_ENDPOINT_URL, api_key=HUGGING_FACE_API, temperature=0.5)
+    return HuggingFaceEndpoint(repo_id=LLM_REPO_ID, api_key=HUGGING_FACE_API, temperature=0.5)
+
+@st.cache_resource
+def get_qa_chain():
+    """The "stuff" QA chain RetrievalQA uses, shared by all sessions.
+
+    It holds no retriever: each question retrieves from the session's own vector store,
+    so a reloaded or re-tuned store (nprobe, efSearch) takes effect immediately.
+    """
+    return load_qa_chain(get_llm(), chain_type="stuff")
+
+@st.cache_resource
+def get_answer_cache():
+    """Answer cache shared by all sessions; queries are embedded with the shared engine."""
+    return AnswerCache(embed_query=get_embedding_engine(EMBEDDING_MODEL).embed_query)
+
+@st.cache_resource
+def get_corpus():
+    """The persistent multi-source corpus shared by all sessions."""
+    return Corpus(get_embedding_engine(EMBEDDING_MODEL))
+
+@st.cache_resource
+def get_extract_pool():
+    """Process pool for bulk text extraction, sized to the available cores."""
+    return create_pool()
+
+@st.cache_resource
+def get_web_fetcher():
+    """One pooled, cached web fetcher shared by all sessions of this server."""
+    return WebFetcher()
+
 def load_file(file, file_type):
     """Load content from a file (PDF, DOCX, or TXT)."""
     try:
@@ -45,62 +100,290 @@ def load_file(file, file_type):
     except Exception as e:
         raise ValueError(f"Error processing {file_type} file: {e}")
 
-def process_input(input_type, input_data):
-    """Process the input data based on the input type and create a vector store."""
-    # Handle input types
+# Sources whose content is only known once loaded, so they are loaded before the cache lookup
+# (uploads, including Bulk batches, are hashed from their raw bytes)
+LOAD_BEFORE_HASH = ["Web"]
+
+def load_documents(input_type, input_data, streaming=False):
+    """Load a source's text for split_source.
+
+    Returns None for uploads read in streaming mode; split_source reads them lazily.
+    """
     if input_type == "Web":
-        loader = WebBaseLoader(input_data)
-        documents = loader.load()
-    else:
-        documents = load_file(input_data, input_type)
+        # Pages are fetched concurrently; unchanged pages come from the page cache, and
+        # add_web_pages reuses each unchanged page's embeddings
+        urls = [url.strip() for url in input_data if url.strip()]
+        return get_web_fetcher().load_documents(urls)
+    if input_type == "Text":
+        return input_data
+    if input_type == "Bulk":
+        # Pages are extracted on a process pool and merged back in upload order
+        return load_bulk_documents(input_data, executor=get_extract_pool())
+    if streaming:
+        return None
+    return load_file(input_data, input_type)
+
+def source_digest(input_type, input_data, documents=None):
+    """Bytes identifying a source's content, for the index cache key and corpus source id.
 
-    # Split documents into chunks
-    text_splitter = CharacterTextSplitter(chunk_size=1000, chunk_overlap=100)
+    Uploads and text are hashed as given, without extracting anything; web pages are
+    hashed by their fetched text (documents).
+    """
     if input_type == "Web":
-        texts = [str(doc.page_content) for doc in text_splitter.split_documents(documents)]
-    else:
-        texts = text_splitter.split_text(documents)
+        return "\n".join(doc.page_content for doc in documents).encode("utf-8")
+    if input_type == "Text":
+        return input_data.encode("utf-8")
+    if input_type == "Bulk":
+        return b"".join(file_digest(file) for file in input_data)
+    return file_digest(input_data)
 
-    # Create embeddings
-    hf_embeddings = HuggingFaceEmbeddings(
-        model_name="sentence-transformers/all-mpnet-base-v2",
-        model_kwargs={'device': 'cuda' if torch.cuda.is_available() else 'cpu'},
-        encode_kwargs={'normalize_embeddings': False}
-    )
+def hash_source(input_type, input_data, streaming, timings):
+    """Return (documents, source bytes), loading documents only if the hash needs them.
 
-    # Create FAISS index
-    sample_embedding = np.array(hf_embeddings.embed_query("sample text"))
-    dimension = sample_embedding.shape[0]
-    index = faiss.IndexFlatL2(dimension)
+    documents is None when the source has not been loaded yet (or is streamed); the
+    caller loads it with load_documents after a cache miss, so a hit skips extraction.
+    """
+    documents = None
+    if input_type in LOAD_BEFORE_HASH:
+        with timings.span("load"):
+            documents = load_documents(input_type, input_data, streaming)
+    with timings.span("hash"):
+        return documents, source_digest(input_type, input_data, documents)
 
-    # Create FAISS vector store
-    vector_store = FAISS(
+def split_source(input_type, input_data, documents, on_progress=None):
+    """Split a loaded source into chunks (lazily for streamed uploads)."""
+    if documents is None:
+        segments = iter_file_segments(input_data, input_type, on_progress=on_progress)
+        return iter_chunks(segments, chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+    text_splitter = CharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+    if input_type in ["Web", "Bulk"]:
+        return [str(doc.page_content) for doc in text_splitter.split_documents(documents)]
+    return text_splitter.split_text(documents)
+
+def new_store(hf_embeddings, index):
+    """Empty FAISS vector store on the given index."""
+    return FAISS(
         embedding_function=hf_embeddings,
         index=index,
         docstore=InMemoryDocstore(),
         index_to_docstore_id={},
     )
 
-    # Add documents to the vector store
-    vector_store.add_texts(texts)
-    return vector_store
+def add_web_pages(vector_store, documents, timings):
+    """Add each web page's chunks to the vector store, embedding only pages not seen before.
 
-def answer_question(vectorstore, query):
-    """Answers a question based on the provided vector store."""
-    llm = HuggingFaceEndpoint(
-        repo_id="meta-llama/Meta-Llama-3-8B-Instruct",
-        api_key=HUGGING_FACE_API,
-        temperature=0.5
-    )
-    qa = RetrievalQA.from_chain_type(llm=llm, retriever=vectorstore.as_retriever())
-    return qa({"query": query})
+    Every page's vectors are cached on their own (flat, keyed by the page text and the
+    chunking settings), so when one of several URLs changes only that page is re-embedded.
+    """
+    index_cache = get_index_cache()
+    text_splitter = CharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+    for document in documents:
+        key = cache_key(document.page_content.encode("utf-8"), "Web page", CHUNK_SIZE, CHUNK_OVERLAP,
+                        EMBEDDING_MODEL)
+        with timings.span("page_cache_load", unit="vectors") as counts:
+            page_store = index_cache.load(key, vector_store.embedding_function)
+            counts["items"] = page_store.index.ntotal if page_store is not None else 0
+        if page_store is None:
+            page_store = new_store(vector_store.embedding_function, faiss.IndexFlatL2(vector_store.index.d))
+            texts = [str(doc.page_content) for doc in text_splitter.split_documents([document])]
+            add_in_batches(page_store, timings.iter("split", texts, unit="chunks"), timings=timings)
+            with timings.span("page_cache_save"):
+                index_cache.save(key, page_store)
+        with timings.span("page_merge", unit="vectors") as counts:
+            count = page_store.index.ntotal
+            if count:
+                vectors = page_store.index.reconstruct_n(0, count)
+                texts = [page_store.docstore.search(page_store.index_to_docstore_id[i]).page_content
+                         for i in range(count)]
+                vector_store.add_embeddings(zip(texts, vectors))
+            counts["items"] = count
+
+def source_name(input_type, input_data):
+    """Short label for a source in the corpus list."""
+    if input_type == "Web":
+        return ", ".join(url.strip() for url in input_data if url.strip())
+    if input_type == "Text":
+        return f"Text: {input_data[:40]}"
+    if input_type == "Bulk":
+        return ", ".join(file.name for file in input_data)
+    return input_data.name
+
+def process_input(input_type, input_data, streaming=False, on_progress=None,
+                  index_type="Flat", nprobe=DEFAULT_NPROBE, ef_search=DEFAULT_EF_SEARCH, timings=None):
+    """Process the input data based on the input type and create a vector store.
+
+    With streaming=True, uploaded files are read page by page, chunked incrementally and
+    embedded in fixed-size batches so memory stays flat for very large documents.
+    index_type picks the FAISS index (see vector_index.INDEX_TYPES); IVF indexes are
+    trained automatically once the vectors are in, and nprobe/ef_search tune search.
+    Returns the vector store and its fingerprint (the index cache key). Stage timings
+    are recorded in timings, if given.
+    """
+    timings = timings or Timings()
+    documents, source_bytes = hash_source(input_type, input_data, streaming, timings)
+
+    # Shared embedding engine (loaded once per server process)
+    with timings.span("embedding_model"):
+        hf_embeddings = get_embedding_engine(EMBEDDING_MODEL)
+
+    # Reuse a saved index if this content was already processed with the same settings
+    index_cache = get_index_cache()
+    key = cache_key(source_bytes, input_type, CHUNK_SIZE, CHUNK_OVERLAP, EMBEDDING_MODEL, index_type)
+    with timings.span("index_cache_load", unit="vectors") as counts:
+        vector_store = index_cache.load(key, hf_embeddings)
+        counts["items"] = vector_store.index.ntotal if vector_store is not None else 0
+    if vector_store is not None:
+        tune_index(vector_store.index, nprobe=nprobe, ef_search=ef_search)
+        return vector_store, key
+    if input_type not in LOAD_BEFORE_HASH:
+        with timings.span("load"):
+            documents = load_documents(input_type, input_data, streaming)
+
+    # Create FAISS vector store
+    vector_store = new_store(hf_embeddings, create_index(index_type, hf_embeddings.dimension))
+
+    # Add documents to the vector store (web pages one by one, reusing unchanged pages)
+    if input_type == "Web":
+        add_web_pages(vector_store, documents, timings)
+    else:
+        # Split documents into chunks (timed per chunk, since streamed uploads split lazily)
+        with timings.span("split_setup"):
+            texts = split_source(input_type, input_data, documents, on_progress=on_progress)
+        add_in_batches(vector_store, timings.iter("split", texts, unit="chunks"), timings=timings)
+
+    # Train IVF indexes and save the store for other sessions
+    with timings.span("train", unit="vectors") as counts:
+        if train_index(vector_store, index_type):
+            counts["items"] = vector_store.index.ntotal
+    tune_index(vector_store.index, nprobe=nprobe, ef_search=ef_search)
+    with timings.span("index_cache_save"):
+        index_cache.save(key, vector_store)
+    return vector_store, key
+
+def add_to_corpus(input_type, input_data, streaming=False, on_progress=None, timings=None):
+    """Add a source to the shared corpus, embedding only chunks it does not already hold.
+
+    Returns the corpus vector store, its fingerprint and the number of new vectors.
+    """
+    timings = timings or Timings()
+    documents, source_bytes = hash_source(input_type, input_data, streaming, timings)
+    source_id = cache_key(source_bytes, input_type, CHUNK_SIZE, CHUNK_OVERLAP, EMBEDDING_MODEL)
+    corpus = get_corpus()
+    if source_id in corpus.sources:
+        return corpus.vector_store, corpus.fingerprint, 0
+    if input_type not in LOAD_BEFORE_HASH:
+        with timings.span("load"):
+            documents = load_documents(input_type, input_data, streaming)
+    texts = split_source(input_type, input_data, documents, on_progress=on_progress)
+    texts = timings.iter("split", texts, unit="chunks")
+    with timings.span("corpus_add", unit="vectors") as counts:
+        added = corpus.add_source(source_id, source_name(input_type, input_data), texts)
+        counts["items"] = added
+    return corpus.vector_store, corpus.fingerprint, added
+
+def answer_question(vectorstore, query, fingerprint, semantic_threshold=None, timings=None):
+    """Answers a question based on the provided vector store, reusing cached answers."""
+    timings = timings or Timings()
+    answer_cache = get_answer_cache()
+    with timings.span("answer_cache_lookup"):
+        answer = answer_cache.get(fingerprint, query, semantic_threshold=semantic_threshold)
+    if answer is not None:
+        return answer
+    # Retrieval and the LLM call run as separate steps so they are timed apart
+    with timings.span("retrieval", unit="documents") as counts:
+        sources = vectorstore.as_retriever().invoke(query)
+        counts["items"] = len(sources)
+    with timings.span("llm", unit="characters") as counts:
+        output = get_qa_chain().invoke({"input_documents": sources, "question": query})
+        counts["items"] = len(output["output_text"])
+    answer = {"query": query, "result": output["output_text"]}
+    answer_cache.put(fingerprint, query, answer)
+    return answer
+
+def session_fingerprint():
+    """Answer cache key for the session's vector store.
+
+    A fingerprint of None means the shared corpus, which changes whenever any session
+    adds or removes a source, so its fingerprint is read at question time.
+    """
+    fingerprint = st.session_state["fingerprint"]
+    return get_corpus().fingerprint if fingerprint is None else fingerprint
+
+def timed_stream(tokens, stream_times, start):
+    """Yield tokens, recording seconds to first token and total seconds since start in stream_times."""
+    try:
+        for token in tokens:
+            if "first_token" not in stream_times:
+                stream_times["first_token"] = time.perf_counter() - start
+            yield token
+    finally:
+        # Runs on completion and when a rerun (Cancel) abandons the generator
+        stream_times["total"] = time.perf_counter() - start
+        if hasattr(tokens, "close"):
+            tokens.close()
+
+def stream_answer(vectorstore, query, stream_times):
+    """Retrieve sources for a query and return them with a token stream of the answer.
+
+    Uses the same "stuff" prompt as get_qa_chain.
+    """
+    start = time.perf_counter()
+    sources = vectorstore.as_retriever().invoke(query)
+    stream_times["retrieval"] = time.perf_counter() - start
+    context = "\n\n".join(doc.page_content for doc in sources)
+    prompt = PROMPT.format(context=context, question=query)
+    return sources, timed_stream(get_llm().stream(prompt), stream_times, start)
+
+def show_streamed_answer(query, semantic_threshold=None, timings=None):
+    """Show the sources, then write the answer token by token with timing and a Cancel button."""
+    timings = timings or Timings()
+    answer_cache = get_answer_cache()
+    fingerprint = session_fingerprint()
+    with timings.span("answer_cache_lookup"):
+        answer = answer_cache.get(fingerprint, query, semantic_threshold=semantic_threshold)
+    if answer is not None:
+        st.write(f"**Answer**: {answer['result']}")
+        return
+    try:
+        stream_times = {}
+        sources, tokens = stream_answer(st.session_state["vectorstore"], query, stream_times)
+        with st.expander(f"Sources ({len(sources)})", expanded=True):
+            for doc in sources:
+                st.caption(doc.page_content[:300])
+        # Clicking Cancel reruns the script, which stops the stream
+        st.button("Cancel")
+        st.write("**Answer**:")
+        result = st.write_stream(tokens)
+        st.caption(f"Retrieval {stream_times['retrieval']:.2f}s · "
+                   f"time to first token {stream_times.get('first_token', stream_times['total']):.2f}s · "
+                   f"total {stream_times['total']:.2f}s")
+        timings.add("retrieval", stream_times["retrieval"], len(sources), unit="documents")
+        timings.add("time_to_first_token", stream_times.get("first_token", stream_times["total"]))
+        timings.add("llm", stream_times["total"] - stream_times["retrieval"], len(result), unit="characters")
+        answer_cache.put(fingerprint, query, {"query": query, "result": result})
+    except Exception as e:
+        st.error(f"Error generating answer: {e}")
+
+def show_timings_panel():
+    """Table of the last run's stage timings with JSON lines / Prometheus downloads."""
+    runs = [st.session_state[key] for key in ["process_timings", "answer_timings"] if key in st.session_state]
+    with st.expander("Pipeline timings", expanded=True):
+        if not runs:
+            st.caption("Process an input or ask a question to record timings.")
+            return
+        st.dataframe([row for timings in runs for row in timings.rows()], hide_index=True)
+        col1, col2 = st.columns(2)
+        col1.download_button("Download JSON lines", "".join(t.to_jsonl() for t in runs),
+                             file_name="rag_timings.jsonl", mime="application/jsonl")
+        col2.download_button("Download Prometheus text", prometheus_text(runs),
+                             file_name="rag_timings.prom", mime="text/plain")
 
 # Main application
 def main():
     st.title("40-Tech RAG Q&A App 🚀")
     
     # Select input type
-    input_type = st.selectbox("Select a source", ["Web", "PDF", "DOCX", "Text", "TXT"])
+    input_type = st.selectbox("Select a source", ["Web", "PDF", "DOCX", "Text", "TXT", "Bulk"])
     input_data = None
 
     if input_type == "Web":
@@ -110,20 +393,76 @@ def main():
         input_data = st.file_uploader(f"Upload a {input_type} file", type=input_type.lower())
     elif input_type == "Text":
         input_data = st.text_area("Enter the text")
+    elif input_type == "Bulk":
+        input_data = st.file_uploader("Upload PDF, DOCX or TXT files", type=["pdf", "docx", "txt"],
+                                      accept_multiple_files=True)
     else:
         st.error("Invalid input type")
         return
 
+    # Vector index settings
+    st.sidebar.header("Vector Index")
+    index_type = st.sidebar.selectbox("Index type", INDEX_TYPES)
+    nprobe = st.sidebar.slider("IVF nprobe", 1, 256, DEFAULT_NPROBE, disabled=not index_type.startswith("IVF"))
+    ef_search = st.sidebar.slider("HNSW efSearch", 16, 512, DEFAULT_EF_SEARCH, disabled=index_type != "HNSW")
+
+    # Corpus settings: sources accumulate in one shared, persistent index
+    st.sidebar.header("Corpus")
+    use_corpus = st.sidebar.checkbox("Add sources to the shared corpus",
+                                     help="The corpus always uses a Flat index.")
+    if use_corpus:
+        corpus = get_corpus()
+        sources = corpus.list_sources()
+        for source_id, name, chunk_count in sources:
+            col1, col2 = st.sidebar.columns([4, 1])
+            col1.caption(f"{name} ({chunk_count:,} chunks)")
+            if col2.button("✕", key=f"remove-{source_id}"):
+                corpus.remove_source(source_id)
+                st.session_state["vectorstore"] = corpus.vector_store
+                st.session_state["fingerprint"] = None  # the corpus, see session_fingerprint
+                st.rerun()
+        if sources and st.sidebar.button("Ask the corpus"):
+            st.session_state["vectorstore"] = corpus.vector_store
+            st.session_state["fingerprint"] = None
+
+    # Answer cache settings
+    st.sidebar.header("Answer Cache")
+    semantic_threshold = None
+    if st.sidebar.checkbox("Reuse answers for similar questions"):
+        semantic_threshold = st.sidebar.slider("Similarity threshold", 0.80, 1.00, 0.95, step=0.01)
+
+    streaming = False
+    if input_type in ["PDF", "DOCX", "TXT"]:
+        streaming = st.checkbox("Stream large files page by page", value=True)
+
     if st.button("Process"):
         if not input_data:
             st.error("Please provide valid input.")
             return
 
+        progress_bar = st.progress(0.0, text="Reading input...") if streaming else None
+
+        def show_progress(done, total):
+            progress_bar.progress(min(done / max(total, 1), 1.0), text=f"Processed {done:,} of {total:,}")
+
+        timings = Timings(run="process")
+        st.session_state["process_timings"] = timings
         with st.spinner("Processing input..."):
             try:
-                vectorstore = process_input(input_type, input_data)
+                if use_corpus:
+                    vectorstore, _, added = add_to_corpus(
+                        input_type, input_data, streaming=streaming,
+                        on_progress=show_progress if streaming else None, timings=timings)
+                    fingerprint = None  # the corpus: read at question time
+                    st.success(f"Added {added:,} new chunks to the corpus.")
+                else:
+                    vectorstore, fingerprint = process_input(
+                        input_type, input_data, streaming=streaming,
+                        on_progress=show_progress if streaming else None,
+                        index_type=index_type, nprobe=nprobe, ef_search=ef_search, timings=timings)
+                    st.success("Vector store created successfully!")
                 st.session_state["vectorstore"] = vectorstore
-                st.success("Vector store created successfully!")
+                st.session_state["fingerprint"] = fingerprint
             except Exception as e:
                 st.error(f"Error processing input: {e}")
                 return
@@ -131,13 +470,28 @@ def main():
     # Question-answering section
     if "vectorstore" in st.session_state:
         query = st.text_input("Ask your question")
+        streaming_answer = st.checkbox("Stream the answer", value=True)
         if st.button("Submit"):
-            with st.spinner("Generating answer..."):
-                try:
-                    answer = answer_question(st.session_state["vectorstore"], query)
-                    st.write(f"**Answer**: {answer}")
-                except Exception as e:
-                    st.error(f"Error generating answer: {e}")
+            timings = Timings(run="answer")
+            st.session_state["answer_timings"] = timings
+            if streaming_answer:
+                show_streamed_answer(query, semantic_threshold, timings=timings)
+            else:
+                with st.spinner("Generating answer..."):
+                    try:
+                        answer = answer_question(st.session_state["vectorstore"], query,
+                                                 session_fingerprint(), semantic_threshold,
+                                                 timings=timings)
+                        st.write(f"**Answer**: {answer}")
+                    except Exception as e:
+                        st.error(f"Error generating answer: {e}")
+        stats = get_answer_cache().stats()
+        st.sidebar.caption(f"Answer cache: {stats['hits']} hits, {stats['semantic_hits']} similar hits, "
+                           f"{stats['misses']} misses ({stats['hit_rate']:.0%} hit rate)")
+
+    # Debug panel with the stage timings of the last Process and Submit
+    if st.sidebar.checkbox("Show pipeline timings"):
+        show_timings_panel()
 
 if __name__ == "__main__":
     import os
@@ -0,0 +1,90 @@
+# Per-stage timing for the RAG pipeline, exportable as JSON lines or Prometheus text
+import json
+import time
+from contextlib import contextmanager
+
+
+class Timings:
+    """Accumulates wall time and item counts per pipeline stage.
+
+    A stage can be timed several times (e.g. once per embedding batch); its seconds and
+    counts add up.
+    """
+
+    def __init__(self, run=""):
+        self.run = run
+        self.stages = {}  # stage -> {"seconds": float, "calls": int, "items": int, "bytes": int, "unit": str}
+
+    def _stage(self, stage, unit):
+        if stage not in self.stages:
+            self.stages[stage] = {"seconds": 0.0, "calls": 0, "items": 0, "bytes": 0, "unit": unit}
+        return self.stages[stage]
+
+    def add(self, stage, seconds, items=0, nbytes=0, unit="items"):
+        """Record one timed call of a stage."""
+        record = self._stage(stage, unit)
+        record["seconds"] += seconds
+        record["calls"] += 1
+        record["items"] += items
+        record["bytes"] += nbytes
+
+    @contextmanager
+    def span(self, stage, unit="items"):
+        """Time a block; set "items"/"bytes" on the yielded dict to record counts."""
+        counts = {"items": 0, "bytes": 0}
+        start = time.perf_counter()
+        try:
+            yield counts
+        finally:
+            self.add(stage, time.perf_counter() - start, counts["items"], counts["bytes"], unit)
+
+    def iter(self, stage, iterable, unit="items"):
+        """Wrap a lazy iterable, timing only the work done to produce each item.
+
+        The time includes any lazy work upstream, e.g. page extraction feeding a splitter.
+        """
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.add(stage, time.perf_counter() - start, 0, 0, unit)
+                return
+            nbytes = len(item.encode("utf-8")) if isinstance(item, str) else 0
+            self.add(stage, time.perf_counter() - start, 1, nbytes, unit)
+            yield item
+
+    def rows(self):
+        """One dict per stage, with throughput in units per second."""
+        rows = []
+        for stage, record in self.stages.items():
+            rate = record["items"] / record["seconds"] if record["seconds"] and record["items"] else 0.0
+            rows.append({"run": self.run, "stage": stage, **record, "per_sec": rate})
+        return rows
+
+    def to_jsonl(self):
+        return "".join(json.dumps(row) + "\n" for row in self.rows())
+
+    def to_prometheus(self, prefix="rag"):
+        return prometheus_text([self], prefix)
+
+
+def prometheus_text(runs, prefix="rag"):
+    """Prometheus text exposition of several Timings, labelled by run and stage."""
+    metrics = [
+        ("stage_seconds", "Wall time spent in a pipeline stage.", lambda r: f"{r['seconds']:.6f}", False),
+        ("stage_items", "Items processed by a pipeline stage.", lambda r: r["items"], True),
+        ("stage_bytes", "Bytes processed by a pipeline stage.", lambda r: r["bytes"], False),
+    ]
+    lines = []
+    for name, help_text, value, with_unit in metrics:
+        lines.append(f"# HELP {prefix}_{name} {help_text}")
+        lines.append(f"# TYPE {prefix}_{name} gauge")
+        for timings in runs:
+            for stage, record in timings.stages.items():
+                labels = f'run="{timings.run}",stage="{stage}"'
+                if with_unit:
+                    labels += f',unit="{record["unit"]}"'
+                lines.append(f"{prefix}_{name}{{{labels}}} {value(record)}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,102 @@
+# FAISS index types for the RAG vector store: flat, IVF-Flat, IVF-PQ and HNSW
+import math
+
+import faiss
+import numpy as np
+
+INDEX_TYPES = ["Flat", "IVF-Flat", "IVF-PQ", "HNSW"]
+
+# Search-time defaults
+DEFAULT_NPROBE = 16
+DEFAULT_EF_SEARCH = 64
+HNSW_M = 32
+PQ_NBITS = 8
+
+
+def choose_nlist(n_vectors):
+    """Number of IVF lists: about 4 * sqrt(n), with at least 39 training points per list."""
+    return max(1, min(65536, int(4 * math.sqrt(n_vectors)), n_vectors // 39))
+
+
+def choose_pq_m(dimension):
+    """Largest sub-quantizer count up to 64 that divides the dimension."""
+    for m in (64, 48, 32, 24, 16, 12, 8, 4, 2, 1):
+        if dimension % m == 0:
+            return m
+    return 1
+
+
+def min_training_size(index_type):
+    """Fewest vectors an index type can be trained on."""
+    if index_type == "IVF-Flat":
+        return 39
+    if index_type == "IVF-PQ":
+        # Each PQ codebook has 2 ** nbits centroids and k-means needs one point per centroid
+        return 2 ** PQ_NBITS
+    return 0
+
+
+def create_index(index_type, dimension):
+    """Index to add vectors to while ingesting.
+
+    HNSW is built directly. IVF indexes need training data first, so they start as a
+    flat index and are converted by train_index once all vectors are in.
+    """
+    if index_type == "HNSW":
+        index = faiss.IndexHNSWFlat(dimension, HNSW_M)
+        index.hnsw.efSearch = DEFAULT_EF_SEARCH
+        return index
+    if index_type in INDEX_TYPES:
+        return faiss.IndexFlatL2(dimension)
+    raise ValueError(f"Unsupported index type: {index_type}")
+
+
+def build_trained_index(index_type, vectors):
+    """Train an IVF index on vectors and add them, or return None if there are too few to train."""
+    n_vectors, dimension = vectors.shape
+    if n_vectors < min_training_size(index_type):
+        return None
+    nlist = choose_nlist(n_vectors)
+    quantizer = faiss.IndexFlatL2(dimension)
+    if index_type == "IVF-Flat":
+        index = faiss.IndexIVFFlat(quantizer, dimension, nlist)
+    elif index_type == "IVF-PQ":
+        index = faiss.IndexIVFPQ(quantizer, dimension, nlist, choose_pq_m(dimension), PQ_NBITS)
+    else:
+        raise ValueError(f"Index type does not need training: {index_type}")
+    index.train(vectors)
+    index.add(vectors)
+    index.nprobe = min(DEFAULT_NPROBE, nlist)
+    return index
+
+
+def train_index(vector_store, index_type):
+    """Replace a store's flat index with a trained IVF index once enough vectors exist.
+
+    Vectors are re-added in their original order, so index_to_docstore_id stays valid.
+    Returns True if the index was converted.
+    """
+    if index_type not in ("IVF-Flat", "IVF-PQ"):
+        return False
+    flat_index = vector_store.index
+    if flat_index.ntotal == 0:
+        return False
+    vectors = flat_index.reconstruct_n(0, flat_index.ntotal)
+    trained = build_trained_index(index_type, np.ascontiguousarray(vectors, dtype="float32"))
+    if trained is None:
+        return False
+    vector_store.index = trained
+    return True
+
+
+def tune_index(index, nprobe=None, ef_search=None):
+    """Apply search-time parameters: nprobe for IVF indexes, efSearch for HNSW."""
+    if nprobe is not None:
+        try:
+            ivf = faiss.extract_index_ivf(index)
+            ivf.nprobe = min(nprobe, ivf.nlist)
+        except RuntimeError:
+            pass
+    if ef_search is not None and isinstance(index, faiss.IndexHNSW):
+        index.hnsw.efSearch = ef_search
+    return index
@@ -0,0 +1,151 @@
+# Concurrent web page fetching with a pooled session and an on-disk page cache
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+import requests
+from bs4 import BeautifulSoup
+from langchain_core.documents import Document
+from requests.adapters import HTTPAdapter
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".page_cache")
+CACHE_VERSION = 2
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (compatible; 40-Tech-RAG/1.0)",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+}
+
+
+@dataclass
+class FetchResult:
+    url: str
+    html: str
+    status: int
+    from_cache: bool  # True when the page was served from disk (304 or network failure)
+
+
+def response_html(response):
+    """Decoded body of a response.
+
+    requests decodes text/* without a charset as ISO-8859-1, which garbles UTF-8 pages,
+    so a missing charset is detected from the content instead.
+    """
+    if "charset" not in response.headers.get("Content-Type", "").lower():
+        response.encoding = response.apparent_encoding
+    return response.text
+
+
+class PageCache:
+    """Stores fetched HTML plus its ETag/Last-Modified validators, one file pair per URL."""
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir or os.getenv("RAG_PAGE_CACHE_DIR", DEFAULT_CACHE_DIR)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, url):
+        # Versioned, so pages saved before charset detection are fetched again
+        return os.path.join(self.cache_dir, hashlib.sha256(f"{CACHE_VERSION}:{url}".encode("utf-8")).hexdigest())
+
+    def get(self, url):
+        """Return (validators, html) for a cached URL, or (None, None)."""
+        path = self._path(url)
+        try:
+            with open(path + ".json", encoding="utf-8") as f:
+                validators = json.load(f)
+            with open(path + ".html", encoding="utf-8") as f:
+                return validators, f.read()
+        except (OSError, ValueError):
+            return None, None
+
+    def put(self, url, validators, html):
+        """Save a page and its validators, each written to a temp file and renamed into place."""
+        path = self._path(url)
+        _write_atomic(path + ".html", html)
+        _write_atomic(path + ".json", json.dumps(validators))
+
+
+def _write_atomic(path, text):
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+class WebFetcher:
+    """Fetches many URLs at once over a shared connection pool.
+
+    Requests to the same host are limited to per_host at a time, and cached pages are
+    revalidated with If-None-Match / If-Modified-Since so unchanged pages are not downloaded.
+    """
+
+    def __init__(self, cache=None, max_workers=8, per_host=2, timeout=(5, 20), headers=None):
+        self.cache = cache if cache is not None else PageCache()
+        self.max_workers = max_workers
+        self.per_host = per_host
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update(headers or DEFAULT_HEADERS)
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._host_limits = {}
+        self._host_lock = threading.Lock()
+
+    def _host_limit(self, url):
+        host = urlsplit(url).netloc
+        with self._host_lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.BoundedSemaphore(self.per_host)
+            return self._host_limits[host]
+
+    def fetch(self, url):
+        """Fetch one URL, using the page cache for conditional requests."""
+        validators, cached_html = self.cache.get(url)
+        headers = {}
+        if validators:
+            if validators.get("etag"):
+                headers["If-None-Match"] = validators["etag"]
+            if validators.get("last_modified"):
+                headers["If-Modified-Since"] = validators["last_modified"]
+
+        try:
+            with self._host_limit(url):
+                response = self.session.get(url, headers=headers, timeout=self.timeout)
+        except requests.RequestException:
+            # Serve the last good copy if the site is unreachable
+            if cached_html is not None:
+                return FetchResult(url, cached_html, 0, True)
+            raise
+
+        if response.status_code == 304 and cached_html is not None:
+            return FetchResult(url, cached_html, 304, True)
+
+        response.raise_for_status()
+        html = response_html(response)
+        new_validators = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+        if new_validators["etag"] or new_validators["last_modified"]:
+            self.cache.put(url, new_validators, html)
+        return FetchResult(url, html, response.status_code, False)
+
+    def fetch_all(self, urls):
+        """Fetch URLs concurrently; results come back in the same order as urls."""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(self.fetch, urls))
+
+    def load_documents(self, urls):
+        """Fetch URLs and return LangChain documents, like WebBaseLoader.load()."""
+        documents = []
+        for result in self.fetch_all(urls):
+            soup = BeautifulSoup(result.html, "html.parser")
+            metadata = {"source": result.url}
+            if soup.title and soup.title.string:
+                metadata["title"] = soup.title.string.strip()
+            documents.append(Document(page_content=soup.get_text(), metadata=metadata))
+        return documents
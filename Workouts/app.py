@@ -1,11 +1,14 @@
 # Import necessary libraries
 import streamlit as st
-import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import textwrap
 from matplotlib.ticker import FuncFormatter
 import altair as alt
+from chart_cache import ChartCache
+from chart_payload import check_payload
+from data_viewer import data_viewer
+from workout_data import load_cube, load_workouts, rollup, slice_cube
 
 # Set the page layout to wide
 #st.set_page_config(layout="wide")
@@ -13,15 +16,67 @@ import altair as alt
 # File Path
 file_path = "data/workout_history_cleaned.csv"
 
-# Load the data
-df = pd.read_csv(file_path)
-df["time_of_day"] = df["time_of_day"].astype(str).replace("NaT", "Unknown")
-df["month"] = df["month"].astype(str)
-df["year"] = df["year"].astype(str)
-df["class_name"] = df["class_name"].fillna("Unknown")
+# Load the data (parsed and cleaned once, then reused until the CSV changes)
+df, data_version = load_workouts(file_path)
 
-# Extract everything before 'w/ ' or similar patterns
-df['location'] = df['location'].str.extract(r"^(.*?)(?:, LLC\.| w/|$)")[0].str.strip()
+# Pre-aggregated counts and durations that every metric and chart below is answered from
+cube, _ = load_cube(file_path)
+
+
+# Rendered matplotlib charts, shared by all sessions
+@st.cache_resource
+def get_chart_cache():
+    return ChartCache()
+
+chart_cache = get_chart_cache()
+
+
+# Matplotlib charts (each returns a figure; the chart cache renders and closes it)
+def plot_class_frequency(class_counts):
+    fig, ax = plt.subplots()
+    sns.barplot(x=class_counts.index, y=class_counts.values, palette="viridis", ax=ax)
+    ax.set_title("Class Frequency", fontsize=12)
+    ax.set_xlabel("Class Name", fontsize=10)
+    ax.set_ylabel("Count", fontsize=10)
+
+    # Wrap and rotate x-axis labels
+    wrapped_labels = [textwrap.fill(label, 10) for label in class_counts.index]
+    rotation_angle = 45 if len(class_counts) > 5 else 0
+    ax.set_xticklabels(wrapped_labels, rotation=rotation_angle, ha="right", fontsize=8)
+
+    # Format y-axis for better readability
+    ax.yaxis.set_major_formatter(FuncFormatter(lambda x, _: f"{int(x):,}"))
+    ax.set_ylim(0, class_counts.max() * 1.1)
+    return fig
+
+
+def plot_sessions_over_time(sessions_over_time):
+    fig, ax = plt.subplots()
+    sessions_over_time.plot(ax=ax, title="Sessions Over Time", marker="o")
+    ax.set_ylabel("Number of Sessions")
+    return fig
+
+
+def plot_time_of_day(time_counts):
+    # Create a figure and axis for the heatmap
+    fig, ax = plt.subplots()
+    
+    # Plot a heatmap of the time counts
+    sns.heatmap(
+        [time_counts.values],  # Data for the heatmap
+        annot=True,            # Annotate each cell with the numeric value
+        fmt="d",               # Format the annotations as integers
+        cmap="Blues",          # Color map for the heatmap
+        xticklabels=time_counts.index,  # Labels for the x-axis
+        ax=ax,
+    )
+    
+    # Set the title of the heatmap
+    ax.set_title("Session Popularity by Time of Day", fontsize=12)
+    
+    # Rotate and format the x-axis labels
+    ax.set_xticklabels(time_counts.index, rotation=30, ha="right", fontsize=9)
+    return fig
 
 
 # Title and Description
@@ -38,7 +93,7 @@ excluded_classes = ["Unknown", "Boot Camp", "Fighting Mastery™", "Valente Brot
                     "Adult VB Seminar", "Fighting Foundations™"] 
 
 # Filter the class_name column to exclude specific classes
-available_classes = df["class_name"].unique()
+available_classes = cube["class_name"].unique()
 filtered_classes = [cls for cls in available_classes if cls not in excluded_classes]
 
 # Sidebar Filters
@@ -46,7 +101,7 @@ st.sidebar.header("Filter Options")
 
 # Multi-select for year
 selected_year = st.sidebar.multiselect(
-    "Select Year", sorted(df["year"].unique()), default=df["year"].unique()
+    "Select Year", sorted(cube["year"].unique()), default=cube["year"].unique()
 )
 
 # Add vertical space
@@ -54,7 +109,7 @@ st.sidebar.markdown("<br>", unsafe_allow_html=True)
 
 # Multi-select for location
 location = st.sidebar.multiselect(
-    "Select Location", sorted(df["location"].unique()), default=df["location"].unique()
+    "Select Location", sorted(cube["location"].unique()), default=cube["location"].unique()
 )
 
 # Add vertical space
@@ -65,32 +120,30 @@ selected_class = st.sidebar.multiselect(
     "Select Class", filtered_classes, default=filtered_classes
 )
 
-# Apply Filters
-filtered_df = df[
-    (df["year"].isin(selected_year)) & 
-    (df["class_name"].isin(selected_class) & 
-     (df["location"].isin(location)))
-]
+# Apply Filters to the cube (one row per distinct group, not per session)
+filtered_cube = slice_cube(cube, selected_year, location, selected_class)
+
+# Rendered charts are cached per chart type, filter selection and data version
+selection = (data_version, tuple(sorted(selected_year)), tuple(sorted(location)), tuple(sorted(selected_class)))
 
 with st.container():
-    with st.expander("View the data"):
-        st.write( """
+    # Only the visible page is sent; nothing is computed while the toggle is off
+    data_viewer(df, data_version, key="workouts", description="""
                 The data below is an export from 
                 Mindbody.com. It contains the workout history
                 & was done using BeautifulSoup. 
                 """)
-        st.dataframe(df)
 
 
-if filtered_df.empty:
+if filtered_cube.empty:
     st.write("### No data available for the selected filters.")
 else:
 # Key Metrics
     with st.container():
         st.write("### Key Metrics")
-        total_sessions = len(filtered_df)
-        total_duration_minutes = filtered_df["duration"].sum()
-        avg_duration_minutes = filtered_df["duration"].mean()
+        total_sessions = int(filtered_cube["sessions"].sum())
+        total_duration_minutes = filtered_cube["duration"].sum()
+        avg_duration_minutes = total_duration_minutes / total_sessions
 
         # Convert duration to hours
         total_duration_hours = total_duration_minutes / 60
@@ -103,63 +156,51 @@ else:
         col4.metric("Total Duration (mins)", f"{total_duration_minutes:,.0f}")
 
     # Class Frequency Bar Chart
-    class_counts = filtered_df["class_name"].value_counts()
+    class_counts = rollup(filtered_cube, "class_name")["sessions"].sort_values(ascending=False)
+    class_counts.index = class_counts.index.astype(str)
     st.markdown("<br>", unsafe_allow_html=True)
     st.markdown("""\n\n ### Streamlit Simple bar chart \n #### Class Frequency""")
                
+    check_payload("Class frequency", class_counts)
     st.bar_chart(class_counts, horizontal=True, color="#fd0",
                      y_label="Class Type", x_label="Number of Sessions")
     
     with st.container():
         st.write("### Class Frequency")
-        #class_counts = filtered_df["class_name"].value_counts()
-        fig, ax = plt.subplots()
-        sns.barplot(x=class_counts.index, y=class_counts.values, palette="viridis", ax=ax)
-        ax.set_title("Class Frequency", fontsize=12)
-        ax.set_xlabel("Class Name", fontsize=10)
-        ax.set_ylabel("Count", fontsize=10)
-
-        # Wrap and rotate x-axis labels
-        wrapped_labels = [textwrap.fill(label, 10) for label in class_counts.index]
-        rotation_angle = 45 if len(class_counts) > 5 else 0
-        ax.set_xticklabels(wrapped_labels, rotation=rotation_angle, ha="right", fontsize=8)
-
-        # Format y-axis for better readability
-        ax.yaxis.set_major_formatter(FuncFormatter(lambda x, _: f"{int(x):,}"))
-        ax.set_ylim(0, class_counts.max() * 1.1)
-        st.pyplot(fig)
+        png = chart_cache.get_or_render(("class_frequency",) + selection,
+                                        lambda: plot_class_frequency(class_counts))
+        st.image(png, use_container_width=True)
         
     # Sessions Over Time Line Chart
-    filtered_df["date"] = pd.to_datetime(
-        filtered_df["year"] + " " + filtered_df["month"], format="%Y %B"
-    )
-    sessions_over_time = filtered_df.groupby("date").size()
+    sessions_over_time = rollup(filtered_cube, "date")["sessions"]
     st.markdown("""\n\n ### Modern Streamlit Line Chart \n #### Sessions Over Time""")
+    check_payload("Sessions over time", sessions_over_time)
     st.area_chart(sessions_over_time, color="#fd0", x_label="Date", y_label="Number of Sessions")
     
     with st.container():
         st.write("### Sessions Over Time")
-        fig, ax = plt.subplots()
-        sessions_over_time.plot(ax=ax, title="Sessions Over Time", marker="o")
-        ax.set_ylabel("Number of Sessions")
-        st.pyplot(fig)
+        png = chart_cache.get_or_render(("sessions_over_time",) + selection,
+                                        lambda: plot_sessions_over_time(sessions_over_time))
+        st.image(png, use_container_width=True)
   
 
     # Heatmap for Popular Time of Day
-    # Ensure time_of_day is sorted properly
-    filtered_df = filtered_df.sort_values("time_of_day")
+    # One row per month x time of day cell, so the browser only draws (no aggregation)
+    month_time_counts = rollup(filtered_cube, ["month", "time_of_day"])["sessions"].reset_index()
+    month_time_counts = month_time_counts.sort_values("time_of_day")
+    check_payload("Heatmap", month_time_counts)
 
     st.markdown("""\n\n ### Modern Heatmap \n ***Using Altiar***""")
     
     # Altair Heatmap
     heatmap = (
-        alt.Chart(filtered_df)
+        alt.Chart(month_time_counts)
         .mark_rect()
         .encode(
             x=alt.X("time_of_day:O", title="Time of Day"),
             y=alt.Y("month:O", title="Month"),
-            color=alt.Color("count()", title="Number of Sessions"),
-            tooltip=["month", "time_of_day", "count()"],
+            color=alt.Color("sessions:Q", title="Number of Sessions"),
+            tooltip=["month", "time_of_day", alt.Tooltip("sessions:Q", title="Number of Sessions")],
         )
         .properties(title="Session Popularity by Time of Day and Month")
         .interactive()
@@ -171,32 +212,22 @@ else:
     with st.container():
         st.write("### Popular Time of Day")
         
-        # Extract time from the "time_of_day" column and handle missing values
-        filtered_df["time_of_day"] = filtered_df["time_of_day"].str.extract(r"(\d+:\d+\w+)").fillna("Unknown")
+        # Extract time from the "time_of_day" labels (dropping e.g. " EDT") and handle missing values
+        time_counts = rollup(filtered_cube, "time_of_day")["sessions"]
+        time_labels = time_counts.index.astype(str).str.extract(r"(\d+:\d+\w+)")[0].fillna("Unknown")
         
-        # Count the occurrences of each time of day and sort the index
-        time_counts = filtered_df["time_of_day"].value_counts().sort_index()
+        # Sum the sessions for each time of day and sort the index
+        time_counts = time_counts.groupby(time_labels.values).sum().sort_index()
 
-        # Create a figure and axis for the heatmap
-        fig, ax = plt.subplots()
-        
-        # Plot a heatmap of the time counts
-        sns.heatmap(
-            [time_counts.values],  # Data for the heatmap
-            annot=True,            # Annotate each cell with the numeric value
-            fmt="d",               # Format the annotations as integers
-            cmap="Blues",          # Color map for the heatmap
-            xticklabels=time_counts.index,  # Labels for the x-axis
-        )
-        
-        # Set the title of the heatmap
-        ax.set_title("Session Popularity by Time of Day", fontsize=12)
-        
-        # Rotate and format the x-axis labels
-        ax.set_xticklabels(time_counts.index, rotation=30, ha="right", fontsize=9)
-        
         # Display the heatmap in the Streamlit app
-        st.pyplot(fig)
+        png = chart_cache.get_or_render(("time_of_day",) + selection,
+                                        lambda: plot_time_of_day(time_counts))
+        st.image(png, use_container_width=True)
+
+# Chart cache health: the live figure count should stay at zero between reruns
+stats = chart_cache.stats()
+st.sidebar.caption(f"Chart cache: {stats['hit_rate']:.0%} hit rate, {stats['entries']} charts "
+                   f"({stats['bytes'] / 1024 ** 2:.1f} MB), {stats['live_figures']} live figures")
 
 
 st.markdown("© CodeRod Solutions LLC 2025")
\ No newline at end of file
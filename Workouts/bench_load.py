@@ -0,0 +1,57 @@
+# Compare the per-rerun cost of loading the workout history: raw parse vs the cached, typed frame
+#
+# Usage (from the Workouts folder):
+#   python bench_load.py [--csv data/workout_history_cleaned.csv] [--reruns 50]
+import argparse
+import time
+import tracemalloc
+
+import pandas as pd
+
+from workout_data import load_workouts, prepare_workouts
+
+
+def raw_load(file_path):
+    """What app.py used to do at the top of every rerun."""
+    df = pd.read_csv(file_path)
+    df["time_of_day"] = df["time_of_day"].astype(str).replace("NaT", "Unknown")
+    df["month"] = df["month"].astype(str)
+    df["year"] = df["year"].astype(str)
+    df["class_name"] = df["class_name"].fillna("Unknown")
+    df["location"] = df["location"].str.extract(r"^(.*?)(?:, LLC\.| w/|$)")[0].str.strip()
+    return df
+
+
+def measure(load, reruns):
+    """Mean seconds and peak traced memory per rerun."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    for _ in range(reruns):
+        df = load()
+    seconds = (time.perf_counter() - start) / reruns
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return df, seconds, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-rerun load time and memory, before and after caching.")
+    parser.add_argument("--csv", default="data/workout_history_cleaned.csv")
+    parser.add_argument("--reruns", type=int, default=50)
+    args = parser.parse_args()
+
+    # The Streamlit caches also work outside a server (with a "No runtime found" warning)
+    load_workouts(args.csv)  # warm the cache, as the first rerun would
+    rows = [
+        ("raw parse (before)",) + measure(lambda: raw_load(args.csv), args.reruns),
+        ("typed, uncached",) + measure(lambda: prepare_workouts(pd.read_csv(args.csv)), args.reruns),
+        ("cached (after)",) + measure(lambda: load_workouts(args.csv)[0], args.reruns),
+    ]
+    print(f"{'path':<22}{'ms/rerun':>10}{'peak KB':>10}{'frame KB':>10}")
+    for name, df, seconds, peak in rows:
+        frame_kb = df.memory_usage(deep=True).sum() / 1024
+        print(f"{name:<22}{seconds * 1000:>10.3f}{peak / 1024:>10.1f}{frame_kb:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# Memoized matplotlib chart rendering shared by all sessions of app.py
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+import matplotlib.pyplot as plt
+
+DEFAULT_MAX_BYTES = 64 * 1024 ** 2  # 64 MB of rendered PNGs
+SAVEFIG_OPTIONS = {"format": "png", "bbox_inches": "tight", "dpi": 200}  # same as st.pyplot
+
+
+def live_figures():
+    """Number of matplotlib figures currently open in this process."""
+    return len(plt.get_fignums())
+
+
+class ChartCache:
+    """LRU cache of rendered chart PNGs, capped by total size in bytes.
+
+    Keys should identify the chart type, the filter selection and the data version.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._images = OrderedDict()  # key -> PNG bytes
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get_or_render(self, key, render):
+        """Return the PNG for key, calling render() -> Figure only on a miss.
+
+        The figure is always closed after rendering, even if saving it fails.
+        """
+        with self._lock:
+            png = self._images.get(key)
+            if png is not None:
+                self._images.move_to_end(key)
+                self.hits += 1
+                return png
+            self.misses += 1
+
+        fig = render()
+        try:
+            buffer = BytesIO()
+            fig.savefig(buffer, **SAVEFIG_OPTIONS)
+            png = buffer.getvalue()
+        finally:
+            plt.close(fig)
+
+        with self._lock:
+            if key not in self._images:
+                self._images[key] = png
+                self._size += len(png)
+            while self._size > self.max_bytes and len(self._images) > 1:
+                _, evicted = self._images.popitem(last=False)
+                self._size -= len(evicted)
+        return png
+
+    def stats(self):
+        """Hit rate, cache size and live figure count."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._images),
+                "bytes": self._size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "live_figures": live_figures(),
+            }
@@ -0,0 +1,28 @@
+# Size budget for the data app.py sends to browser-rendered charts
+import os
+
+import pandas as pd
+import streamlit as st
+
+MAX_ROWS = int(os.environ.get("WORKOUTS_CHART_MAX_ROWS", 2_000))
+MAX_BYTES = int(os.environ.get("WORKOUTS_CHART_MAX_BYTES", 256 * 1024))
+
+
+def payload_size(data):
+    """(rows, approximate JSON bytes) of a frame or series handed to a chart."""
+    if isinstance(data, pd.Series):
+        data = data.reset_index()  # the index is plotted too
+    return len(data), len(data.to_json(orient="records", date_format="iso"))
+
+
+def check_payload(name, data, max_rows=MAX_ROWS, max_bytes=MAX_BYTES):
+    """Warn in the app when a chart would ship more rows or bytes than the budget allows.
+
+    Charts should be fed one row per plotted cell or bar; a warning here usually means
+    raw session rows are being sent for the browser to aggregate.
+    """
+    rows, nbytes = payload_size(data)
+    if rows > max_rows or nbytes > max_bytes:
+        st.warning(f"{name} chart payload is {rows:,} rows / {nbytes / 1024:,.1f} KB "
+                   f"(budget {max_rows:,} rows / {max_bytes / 1024:,.0f} KB).")
+    return rows, nbytes
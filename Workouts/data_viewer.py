@@ -0,0 +1,71 @@
+# Paginated raw-data viewer: only the visible page of rows is sent to the browser
+import math
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+PAGE_SIZES = [25, 50, 100, 250]
+
+
+def _matches(column, text):
+    """Boolean array of rows whose value contains text (case-insensitive)."""
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        # Search the few distinct labels, then map back to rows through the codes
+        hits = column.cat.categories.astype(str).str.contains(text, case=False, regex=False)
+        return np.isin(column.cat.codes.to_numpy(), np.flatnonzero(hits))
+    return column.astype(str).str.contains(text, case=False, regex=False).to_numpy()
+
+
+# The frame is not hashed (that would cost O(rows) per rerun); callers pass a version
+# that changes whenever the frame's contents do
+@st.cache_resource(show_spinner=False, max_entries=16)
+def _row_order(_df, version, columns, text, sort_by, descending):
+    """Positions of the rows to show, filtered and sorted; None means all rows in order."""
+    positions = None
+    if text:
+        mask = np.zeros(len(_df), dtype=bool)
+        for column in columns:
+            mask |= _matches(_df[column], text)
+        positions = np.flatnonzero(mask)
+    if sort_by:
+        values = _df[sort_by] if positions is None else _df[sort_by].iloc[positions]
+        order = values.reset_index(drop=True).sort_values(
+            ascending=not descending, kind="stable", na_position="last").index.to_numpy()
+        positions = order if positions is None else positions[order]
+    return positions
+
+
+def data_viewer(df, version, key, label="View the data", description=None):
+    """Toggleable table with server-side column projection, text filter, sort and paging.
+
+    Nothing is computed or sent while the toggle is off. When it is on, filtering and
+    sorting are cached per (version, settings), so paging costs one page of rows.
+    """
+    if not st.toggle(label, key=f"{key}_open"):
+        return
+    if description:
+        st.write(description)
+
+    all_columns = list(df.columns)
+    columns = st.multiselect("Columns", all_columns, default=all_columns, key=f"{key}_columns") or all_columns
+    col1, col2, col3 = st.columns([2, 2, 1])
+    text = col1.text_input("Filter rows containing", key=f"{key}_filter").strip()
+    sort_by = col2.selectbox("Sort by", [None] + columns, key=f"{key}_sort",
+                             format_func=lambda c: "(original order)" if c is None else c)
+    descending = col3.checkbox("Descending", key=f"{key}_descending")
+
+    positions = _row_order(df, version, tuple(columns), text, sort_by, descending)
+    total = len(df) if positions is None else len(positions)
+
+    col1, col2 = st.columns(2)
+    page_size = col1.selectbox("Rows per page", PAGE_SIZES, index=1, key=f"{key}_page_size")
+    pages = max(1, math.ceil(total / page_size))
+    page = min(int(col2.number_input(f"Page (of {pages:,})", min_value=1, step=1, key=f"{key}_page")), pages)
+
+    start = (page - 1) * page_size
+    stop = min(start + page_size, total)
+    rows = slice(start, stop) if positions is None else positions[start:stop]
+    st.dataframe(df.iloc[rows][columns])
+    filtered = f" (filtered from {len(df):,})" if text else ""
+    st.caption(f"Rows {start + 1 if total else 0:,}–{stop:,} of {total:,}{filtered}")
@@ -0,0 +1,203 @@
+# Incremental ingest of the saved Mindbody activity page into the cleaned workout history
+#
+# Usage (from the Workouts folder):
+#   python mindbody_ingest.py [--html data/Mindbody.htm] [--csv data/workout_history_cleaned.csv]
+#
+# The page lists completed sessions newest first. Sessions are parsed as the HTML streams
+# in, and parsing stops at the first session older than the last ingest, so re-ingesting a
+# slightly larger export only costs time for the new sessions at the top of the page.
+import argparse
+import calendar
+import csv
+import json
+import os
+import re
+import time
+from collections import Counter
+from datetime import date
+from html.parser import HTMLParser
+
+COLUMNS = ["day", "month", "year", "class_name", "location", "time_of_day", "duration"]
+READ_SIZE = 64 * 1024
+
+# CSS module names (the part before "__<hash>") of the elements holding each field
+ITEM_CLASS = "UserScheduleItem_wrapper"
+FIELD_CLASSES = {
+    "UserScheduleItemDate_day": "day",
+    "UserScheduleItemDate_month": "month_year",
+    "UserScheduleItemDetails_headerLink": "class_name",  # unlinked headers ("|", "(RP)") mean no class
+    "UserScheduleItemDetails_link": "location",
+    "UserScheduleItemTime_start": "time_of_day",
+    "UserScheduleItemTime_end": "duration",
+}
+VOID_ELEMENTS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta",
+                 "source", "track", "wbr"}
+MONTH_NUMBERS = {name: number for number, name in enumerate(calendar.month_name) if name}
+
+
+class ScheduleParser(HTMLParser):
+    """Collects the raw fields of each schedule item without building a DOM.
+
+    Every item renders its details twice (mobile and desktop layouts); the first value
+    of each field wins. Finished items are queued on self.items.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.items = []
+        self._stack = []  # one entry per open element: "item", a field name or None
+        self._item = None
+        self._text = None  # (field, [text parts]) while inside a field element
+
+    def handle_starttag(self, tag, attrs):
+        if tag in VOID_ELEMENTS:
+            return
+        modules = {token.split("__")[0] for token in (dict(attrs).get("class") or "").split()}
+        role = None
+        if ITEM_CLASS in modules:
+            role = "item"
+            self._item = {}
+        elif self._item is not None and self._text is None:
+            role = next((FIELD_CLASSES[m] for m in modules if m in FIELD_CLASSES), None)
+            if role is not None:
+                self._text = (role, [])
+        self._stack.append(role)
+
+    def handle_endtag(self, tag):
+        if tag in VOID_ELEMENTS or not self._stack:
+            return
+        role = self._stack.pop()
+        if role == "item":
+            self.items.append(self._item)
+            self._item = None
+        elif role is not None and self._text is not None and self._text[0] == role:
+            field, parts = self._text
+            self._item.setdefault(field, "".join(parts).strip())
+            self._text = None
+
+    def handle_data(self, data):
+        if self._text is not None:
+            self._text[1].append(data)
+
+
+def normalize(item):
+    """Map raw item fields onto the cleaned schema (one dict per session)."""
+    month, _, year = item["month_year"].partition(",")
+    duration = re.search(r"\d+", item.get("duration", ""))
+    return {
+        "day": int(item["day"]),
+        "month": month.strip(),
+        "year": int(year),
+        "class_name": item.get("class_name", ""),
+        "location": item.get("location", ""),
+        "time_of_day": item.get("time_of_day") or "Unknown",
+        "duration": int(duration.group()) if duration else 0,
+    }
+
+
+def session_date(row):
+    return date(int(row["year"]), MONTH_NUMBERS[row["month"]], int(row["day"]))
+
+
+def natural_key(row):
+    """Identifies a session; the same key twice in a day is two bookings, not a duplicate."""
+    return "|".join(str(row[column]) for column in COLUMNS)
+
+
+def iter_sessions(html_path, read_size=READ_SIZE):
+    """Yield sessions from the saved page as they are parsed, newest first."""
+    parser = ScheduleParser()
+    with open(html_path, encoding="utf-8") as f:
+        while chunk := f.read(read_size):
+            parser.feed(chunk)
+            for item in parser.items:
+                yield normalize(item)
+            parser.items.clear()
+    parser.close()
+    for item in parser.items:
+        yield normalize(item)
+
+
+def state_path(csv_path):
+    return csv_path + ".ingest.json"
+
+
+def load_state(csv_path):
+    """Watermark date and the session keys already ingested on that date.
+
+    Read from the sidecar state file, or rebuilt with one pass over an existing CSV.
+    """
+    try:
+        with open(state_path(csv_path), encoding="utf-8") as f:
+            state = json.load(f)
+        return date.fromisoformat(state["watermark"]), Counter(state["keys"])
+    except FileNotFoundError:
+        pass
+    watermark, keys = None, Counter()
+    if os.path.exists(csv_path):
+        with open(csv_path, encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f):
+                day = session_date(row)
+                if watermark is None or day > watermark:
+                    watermark, keys = day, Counter()
+                if day == watermark:
+                    keys[natural_key(row)] += 1
+    return watermark, keys
+
+
+def save_state(csv_path, watermark, keys):
+    tmp_path = state_path(csv_path) + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"watermark": watermark.isoformat(), "keys": dict(keys)}, f)
+    os.replace(tmp_path, state_path(csv_path))
+
+
+def ingest(html_path, csv_path):
+    """Append sessions newer than the watermark to csv_path; return (new rows, sessions parsed)."""
+    watermark, seen = load_state(csv_path)
+    new_rows = []
+    parsed = 0
+    remaining = Counter(seen)  # watermark-day sessions already in the CSV, not yet matched
+    for row in iter_sessions(html_path):
+        parsed += 1
+        day = session_date(row)
+        if watermark is not None and day < watermark:
+            break  # everything further down the page is older
+        key = natural_key(row)
+        if day == watermark and remaining[key] > 0:
+            remaining[key] -= 1
+            continue
+        new_rows.append(row)
+
+    if new_rows:
+        write_header = not os.path.exists(csv_path) or os.path.getsize(csv_path) == 0
+        with open(csv_path, "a", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=COLUMNS, lineterminator="\n")
+            if write_header:
+                writer.writeheader()
+            writer.writerows(new_rows)
+
+        # Advance the watermark to the newest ingested day
+        newest = max(session_date(row) for row in new_rows)
+        if watermark is None or newest > watermark:
+            watermark, seen = newest, Counter()
+        seen.update(natural_key(row) for row in new_rows if session_date(row) == watermark)
+    if watermark is not None:
+        save_state(csv_path, watermark, seen)
+    return new_rows, parsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Append new sessions from a saved Mindbody page to the workout history.")
+    parser.add_argument("--html", default="data/Mindbody.htm")
+    parser.add_argument("--csv", default="data/workout_history_cleaned.csv")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    new_rows, parsed = ingest(args.html, args.csv)
+    elapsed = time.perf_counter() - start
+    print(f"Parsed {parsed} sessions, appended {len(new_rows)} to {args.csv} in {elapsed:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
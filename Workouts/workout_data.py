@@ -0,0 +1,91 @@
+# Cached, typed load of the workout history used by app.py
+import calendar
+import hashlib
+import os
+
+import pandas as pd
+import streamlit as st
+
+MONTHS = list(calendar.month_name)[1:]
+CATEGORY_COLUMNS = ["class_name", "location", "year", "time_of_day"]
+CUBE_DIMENSIONS = ["year", "month", "location", "class_name", "time_of_day"]
+
+
+@st.cache_data(show_spinner=False)
+def file_digest(file_path, mtime_ns, size):
+    """SHA-256 of the CSV; only recomputed when its mtime or size changes."""
+    with open(file_path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def prepare_workouts(df):
+    """Clean a raw workout history frame into compact, typed columns."""
+    df = df.copy()
+    df["time_of_day"] = df["time_of_day"].astype(str).replace("NaT", "Unknown")
+    df["year"] = df["year"].astype(str)
+    df["class_name"] = df["class_name"].fillna("Unknown")
+
+    # Extract everything before 'w/ ' or similar patterns
+    df["location"] = df["location"].str.extract(r"^(.*?)(?:, LLC\.| w/|$)")[0].str.strip()
+
+    # First of the month, used by the sessions-over-time charts
+    df["date"] = pd.to_datetime(df["year"] + " " + df["month"].astype(str), format="%Y %B")
+
+    # Compact columnar form: categoricals for repeated labels, small integers for numbers
+    for column in CATEGORY_COLUMNS:
+        df[column] = df[column].astype("category")
+    df["month"] = pd.Categorical(df["month"].astype(str), categories=MONTHS, ordered=True)
+    df["day"] = pd.to_numeric(df["day"], downcast="integer")
+    df["duration"] = pd.to_numeric(df["duration"].fillna(0), downcast="integer")
+    return df
+
+
+def build_cube(df):
+    """Session counts and duration sums per year x month x location x class x time of day.
+
+    Filters and charts work on this table, whose size depends on the number of distinct
+    groups rather than the number of sessions.
+    """
+    cube = (
+        df.groupby(CUBE_DIMENSIONS, observed=True)
+        .agg(sessions=("duration", "size"), duration=("duration", "sum"))
+        .reset_index()
+    )
+    cube["date"] = pd.to_datetime(cube["year"].astype(str) + " " + cube["month"].astype(str), format="%Y %B")
+    return cube
+
+
+def slice_cube(cube, years, locations, classes):
+    """Rows of the cube matching the sidebar filter selection."""
+    return cube[cube["year"].isin(years) & cube["location"].isin(locations) & cube["class_name"].isin(classes)]
+
+
+def rollup(cube_slice, by):
+    """Sum sessions and duration of a cube slice over the given dimensions."""
+    return cube_slice.groupby(by, observed=True)[["sessions", "duration"]].sum()
+
+
+# cache_resource hands every rerun the same frame instead of a pickled copy,
+# so callers must treat it as read-only
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _load_workouts(file_path, digest):
+    return prepare_workouts(pd.read_csv(file_path))
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _load_cube(file_path, digest):
+    return build_cube(_load_workouts(file_path, digest))
+
+
+def load_workouts(file_path):
+    """Return (workouts frame, data version) for a CSV, parsing it only when its content changes."""
+    stat = os.stat(file_path)
+    digest = file_digest(file_path, stat.st_mtime_ns, stat.st_size)
+    return _load_workouts(file_path, digest), digest
+
+
+def load_cube(file_path):
+    """Return (aggregate cube, data version) for a CSV, rebuilt only when its content changes."""
+    stat = os.stat(file_path)
+    digest = file_digest(file_path, stat.st_mtime_ns, stat.st_size)
+    return _load_cube(file_path, digest), digest
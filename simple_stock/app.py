@@ -2,8 +2,10 @@
 
 import streamlit as st
 import pandas as pd
-import yfinance as yf
+import altair as alt
 from datetime import datetime
+from price_store import PriceStore
+from downsample import downsample_close, resample_ohlc, sum_volume
 
 st.write("""
         # Simple Stock Price App
@@ -11,6 +13,11 @@ st.write("""
         Simple app to show the **Volume** and **Closing Price** of a selected stock. 
         """)
 
+# Local store of daily bars; only date ranges it doesn't hold yet are downloaded
+@st.cache_resource
+def get_price_store():
+    return PriceStore()
+
 # Get the ticker symbol from the user
 ticker_symbol = st.text_input("Enter the ticker symbol of the stock you want to analyze", 'IBM')
 
@@ -24,25 +31,48 @@ st.write(f"Ticker symbol being used: {cleaned_ticker_symbol}")
 start_date = st.date_input("Start Date", datetime(2018, 5, 31))
 end_date = st.date_input("End Date", datetime(2024, 12, 31))
 
+# Chart resolution: about one point per pixel, or aggregated OHLC bars
+bar_period = st.radio("Bars", ["Daily", "Weekly", "Monthly"], horizontal=True)
+chart_width = st.number_input("Chart width (pixels)", min_value=200, max_value=4000, value=800, step=100)
+
+# Weekly/monthly candlesticks with a volume bar chart underneath
+def ohlc_chart(bars):
+    bars = bars.reset_index()
+    base = alt.Chart(bars).encode(
+        x=alt.X("Date:T"),
+        color=alt.condition("datum.Open <= datum.Close", alt.value("#06982d"), alt.value("#ae1325")),
+    )
+    wicks = base.mark_rule().encode(y=alt.Y("Low:Q", title="Price", scale=alt.Scale(zero=False)), y2="High:Q")
+    bodies = base.mark_bar().encode(y="Open:Q", y2="Close:Q")
+    volume = base.mark_bar().encode(y=alt.Y("Volume:Q")).properties(height=120)
+    return alt.vconcat((wicks + bodies).properties(height=300), volume)
+
 # Add a submit button
 if st.button("Submit"):
     try:
-        # Get the data on this ticker from yahoo finance
-        ticker_data = yf.Ticker(cleaned_ticker_symbol)
-
-        # Get the historical prices for this ticker and store in a dataframe
-        ticker_df = ticker_data.history(period='1d', start=start_date, end=end_date)
+        # Get the historical prices for this ticker (from the local store, filling gaps from yahoo finance)
+        ticker_df = get_price_store().history(cleaned_ticker_symbol, start_date, end_date)
 
         # Print stock data to line charts if data is available
-        if not ticker_df.empty:
+        if not ticker_df.empty and bar_period != "Daily":
+            st.write(f"""
+                    ## {bar_period} Price and Volume
+                    """)
+            st.altair_chart(ohlc_chart(resample_ohlc(ticker_df, bar_period)), use_container_width=True)
+        elif not ticker_df.empty:
+            # Send at most ~chart_width points: LTTB keeps the price shape, volume is summed per bucket
+            close = downsample_close(ticker_df.Close, chart_width)
+            volume = sum_volume(ticker_df.Volume, chart_width)
             st.write("""
                     ## Closing Price
                     """)
-            st.line_chart(ticker_df.Close)
+            st.line_chart(close)
             st.write("""
                     ## Volume
                     """)
-            st.line_chart(ticker_df.Volume)
+            st.line_chart(volume)
+            if len(close) < len(ticker_df):
+                st.caption(f"Showing {len(close):,} of {len(ticker_df):,} bars; volume is summed per displayed point.")
         else:
             st.error(f"Invalid symbol or No data available for {cleaned_ticker_symbol} for the specified date range." , icon="🚫")
     except Exception as e:
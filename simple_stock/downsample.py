@@ -0,0 +1,54 @@
+# Reduce long price series to about one point per pixel before charting
+import numpy as np
+import pandas as pd
+
+OHLC_RULES = {"Weekly": "W-FRI", "Monthly": "ME"}
+
+
+def lttb_indices(y, points):
+    """Indices of the points kept by Largest-Triangle-Three-Buckets.
+
+    Keeps the first and last point, and from each bucket in between the point forming
+    the largest triangle with the previously kept point and the next bucket's mean, so
+    peaks and troughs survive. x is the sample position, which suits evenly spaced bars.
+    """
+    n = len(y)
+    if points >= n or points < 3:
+        return np.arange(n)
+    x = np.arange(n, dtype=float)
+    edges = np.linspace(1, n - 1, points - 1).astype(int)  # buckets for all but the end points
+    kept = np.empty(points, dtype=int)
+    kept[0], kept[-1] = 0, n - 1
+    previous = 0
+    for i in range(points - 2):
+        start, stop = edges[i], edges[i + 1]
+        next_stop = edges[i + 2] if i + 2 < len(edges) else n
+        next_x, next_y = x[stop:next_stop].mean(), y[stop:next_stop].mean()
+        # Twice the triangle area for every candidate in the bucket at once
+        areas = np.abs((x[previous] - next_x) * (y[start:stop] - y[previous])
+                       - (x[previous] - x[start:stop]) * (next_y - y[previous]))
+        previous = start + int(np.argmax(areas))
+        kept[i + 1] = previous
+    return kept
+
+
+def downsample_close(close, points):
+    """Shape-preserving subset of a price series (LTTB)."""
+    close = close.dropna()
+    return close.iloc[lttb_indices(close.to_numpy(dtype=float), points)]
+
+
+def sum_volume(volume, points):
+    """Volume summed over consecutive buckets, labelled by each bucket's first date."""
+    if len(volume) <= points:
+        return volume
+    starts = np.linspace(0, len(volume), points, endpoint=False).astype(int)
+    totals = np.add.reduceat(volume.to_numpy(dtype=float), starts)
+    return pd.Series(totals, index=volume.index[starts], name=volume.name)
+
+
+def resample_ohlc(bars, period):
+    """Weekly or monthly OHLC bars with summed volume."""
+    return bars.resample(OHLC_RULES[period]).agg(
+        {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+    ).dropna(subset=["Close"])
@@ -0,0 +1,225 @@
+# Persistent local store of OHLCV bars that only asks the data provider for missing date ranges
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+DEFAULT_PATH = os.environ.get("PRICE_STORE_PATH", ".price_store.sqlite3")
+TODAY_TTL = 900  # seconds a fetch of today's still-forming bar is reused
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bars (
+    ticker TEXT NOT NULL, interval TEXT NOT NULL, ts TEXT NOT NULL,
+    open REAL, high REAL, low REAL, close REAL, volume REAL,
+    PRIMARY KEY (ticker, interval, ts)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS coverage (
+    ticker TEXT NOT NULL, interval TEXT NOT NULL, start TEXT NOT NULL, end TEXT NOT NULL,
+    PRIMARY KEY (ticker, interval, start)
+);
+"""
+
+
+class YahooProvider:
+    """Bars from Yahoo Finance through yfinance."""
+
+    def fetch(self, ticker, start, end, interval="1d"):
+        import yfinance as yf
+        return yf.Ticker(ticker).history(start=start, end=end, interval=interval)
+
+    def fetch_many(self, tickers, start, end, interval="1d"):
+        """One request for several tickers; returns {ticker: bars}."""
+        import yfinance as yf
+        data = yf.download(list(tickers), start=start, end=end, interval=interval, group_by="ticker",
+                           auto_adjust=True, threads=False, progress=False)
+        if not isinstance(data.columns, pd.MultiIndex):
+            return {tickers[0]: data}
+        return {ticker: data[ticker].dropna(how="all") for ticker in tickers if ticker in data.columns.levels[0]}
+
+
+class SyntheticProvider:
+    """Deterministic random-walk bars on weekdays, for running offline.
+
+    Counts its calls so gap-only fetching can be checked, and can simulate a slow or
+    flaky network: each call sleeps latency seconds and every fail_every-th call raises.
+    """
+
+    def __init__(self, latency=0.0, fail_every=0):
+        self.latency = latency
+        self.fail_every = fail_every
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def _call(self, tickers, start, end):
+        with self._lock:
+            self.calls.append((tickers, start, end))
+            failing = self.fail_every and len(self.calls) % self.fail_every == 0
+        time.sleep(self.latency)
+        if failing:
+            raise ConnectionError("synthetic provider failure")
+
+    def fetch(self, ticker, start, end, interval="1d"):
+        self._call(ticker, start, end)
+        return self._bars(ticker, start, end)
+
+    def fetch_many(self, tickers, start, end, interval="1d"):
+        self._call(tuple(tickers), start, end)
+        return {ticker: self._bars(ticker, start, end) for ticker in tickers}
+
+    def _bars(self, ticker, start, end):
+        days = pd.bdate_range(start, end - timedelta(days=1), name="Date")
+        # Seed from the ticker and the day so overlapping fetches agree
+        seeds = [zlib.crc32(f"{ticker}:{day.date()}".encode()) for day in days]
+        close = np.array([100 + np.random.default_rng(seed).normal(0, 5) for seed in seeds])
+        return pd.DataFrame({"Open": close * 0.99, "High": close * 1.01, "Low": close * 0.98,
+                             "Close": close, "Volume": [1_000_000 + seed % 500_000 for seed in seeds]},
+                            index=days)
+
+
+def missing_ranges(start, end, covered):
+    """Parts of [start, end) not inside any of the covered [start, end) date ranges."""
+    gaps = []
+    cursor = start
+    for covered_start, covered_end in sorted(covered):
+        if covered_end <= cursor:
+            continue
+        if covered_start >= end:
+            break
+        if covered_start > cursor:
+            gaps.append((cursor, covered_start))
+        cursor = max(cursor, covered_end)
+    if cursor < end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+def merge_ranges(ranges):
+    """Union of [start, end) ranges, with overlapping and touching ranges joined."""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class PriceStore:
+    """SQLite store of bars per (ticker, interval) plus the date ranges already fetched.
+
+    history() answers the covered part of a request locally and fetches only the gaps.
+    Today's bar is still forming, so today is never marked as covered; after a fetch
+    it counts as covered for today_ttl seconds, so warm calls stay off the network.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, provider=None, today_ttl=TODAY_TTL):
+        self.path = path
+        self.provider = provider or YahooProvider()
+        self.today_ttl = today_ttl
+        self._locks = defaultdict(threading.Lock)  # one per ticker, so sessions don't fetch it twice
+        self._today_fetched = {}  # (ticker, interval) -> (day, time.monotonic()) of the last fetch including today
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        """A connection that commits (or rolls back) and closes when the block exits."""
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def covered(self, ticker, interval="1d", conn=None):
+        """Date ranges [start, end) already fetched for ticker."""
+        if conn is None:
+            with self._connect() as conn:
+                return self.covered(ticker, interval, conn)
+        rows = conn.execute("SELECT start, end FROM coverage WHERE ticker = ? AND interval = ?",
+                            (ticker, interval)).fetchall()
+        return [(date.fromisoformat(start), date.fromisoformat(end)) for start, end in rows]
+
+    def missing(self, ticker, start, end, interval="1d"):
+        """Parts of [start, end) that have to be fetched for ticker."""
+        covered = self.covered(ticker, interval)
+        today = date.today()
+        day, fetched_at = self._today_fetched.get((ticker, interval), (None, 0.0))
+        if day == today and time.monotonic() - fetched_at < self.today_ttl:
+            covered.append((today, today + timedelta(days=1)))
+        return missing_ranges(start, end, covered)
+
+    def history(self, ticker, start, end, interval="1d"):
+        """Bars for ticker in [start, end), indexed by Date, with the OHLCV columns."""
+        ticker = ticker.upper()
+        start, end = pd.Timestamp(start).date(), pd.Timestamp(end).date()
+        with self._locks[ticker]:
+            for gap_start, gap_end in self.missing(ticker, start, end, interval):
+                bars = self.provider.fetch(ticker, gap_start, gap_end, interval)
+                self._save(ticker, interval, gap_start, gap_end, bars)
+        return self.read(ticker, start, end, interval)
+
+    def fill(self, tickers, start, end, interval="1d"):
+        """Fetch whatever [start, end) is missing for several tickers; return the tickers fetched.
+
+        Tickers missing the same range are fetched together in one provider request when
+        the provider has fetch_many.
+        """
+        start, end = pd.Timestamp(start).date(), pd.Timestamp(end).date()
+        by_gap = defaultdict(list)
+        for ticker in tickers:
+            ticker = ticker.upper()
+            for gap in self.missing(ticker, start, end, interval):
+                by_gap[gap].append(ticker)
+        fetched = []
+        for (gap_start, gap_end), group in by_gap.items():
+            if hasattr(self.provider, "fetch_many"):
+                results = self.provider.fetch_many(group, gap_start, gap_end, interval)
+            else:
+                results = {ticker: self.provider.fetch(ticker, gap_start, gap_end, interval) for ticker in group}
+            for ticker, bars in results.items():
+                self._save(ticker, interval, gap_start, gap_end, bars)
+            fetched.extend(group)
+        return fetched
+
+    def _save(self, ticker, interval, start, end, bars):
+        today = date.today()
+        if start <= today < end:
+            # Even an empty answer is current: there is no bar yet before the open or on a holiday
+            self._today_fetched[(ticker, interval)] = (today, time.monotonic())
+        rows = []
+        if bars is not None and not bars.empty:
+            index = bars.index.tz_localize(None) if bars.index.tz is not None else bars.index
+            values = bars[COLUMNS].to_numpy(dtype=float)
+            rows = [(ticker, interval, ts.isoformat(), *row) for ts, row in zip(index, values.tolist())]
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")  # coverage is read and rewritten under the write lock
+            conn.executemany("INSERT OR REPLACE INTO bars VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            # An empty answer may be a provider hiccup or an unknown symbol: don't remember it
+            end = min(end, today)
+            if rows and start < end:
+                ranges = merge_ranges(self.covered(ticker, interval, conn) + [(start, end)])
+                conn.execute("DELETE FROM coverage WHERE ticker = ? AND interval = ?", (ticker, interval))
+                conn.executemany("INSERT INTO coverage VALUES (?, ?, ?, ?)",
+                                 [(ticker, interval, s.isoformat(), e.isoformat()) for s, e in ranges])
+
+    def read(self, ticker, start, end, interval="1d"):
+        """Bars already in the store for ticker in [start, end); never calls the provider."""
+        ticker = ticker.upper()
+        start, end = pd.Timestamp(start).date(), pd.Timestamp(end).date()
+        with self._connect() as conn:
+            df = pd.read_sql_query(
+                "SELECT ts, open, high, low, close, volume FROM bars "
+                "WHERE ticker = ? AND interval = ? AND ts >= ? AND ts < ? ORDER BY ts",
+                conn, params=(ticker, interval, start.isoformat(), end.isoformat()))
+        df.columns = ["Date"] + COLUMNS
+        df["Date"] = pd.to_datetime(df["Date"])
+        return df.set_index("Date")
@@ -0,0 +1,62 @@
+# Download buttons that build the export file only when clicked, cached per frame and format
+import gzip
+import hashlib
+import io
+
+import pandas as pd
+import streamlit as st
+
+# format -> (file extension, MIME type)
+FORMATS = {
+    "CSV": (".csv", "text/csv"),
+    "CSV (gzip)": (".csv.gz", "application/gzip"),
+    "Parquet": (".parquet", "application/vnd.apache.parquet"),
+}
+CHUNK_ROWS = 50_000
+
+
+def frame_fingerprint(df):
+    """SHA-256 of a frame's values, index, column names and dtypes."""
+    digest = hashlib.sha256()
+    digest.update(repr([(str(c), str(t)) for c, t in df.dtypes.items()]).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def write_csv(df, binary_file, chunk_rows=CHUNK_ROWS):
+    """Write df as UTF-8 CSV a chunk of rows at a time, never holding the whole text."""
+    text = io.TextIOWrapper(binary_file, encoding="utf-8", newline="")
+    for start in range(0, max(len(df), 1), chunk_rows):
+        df.iloc[start:start + chunk_rows].to_csv(text, index=False, header=start == 0)
+    text.flush()
+    text.detach()
+
+
+# cache_resource keeps one copy of the bytes instead of unpickling a new one per download
+@st.cache_resource(show_spinner=False, max_entries=8)
+def _export(_df, fingerprint, fmt):
+    buffer = io.BytesIO()
+    if fmt == "CSV":
+        write_csv(_df, buffer)
+    elif fmt == "CSV (gzip)":
+        with gzip.GzipFile(fileobj=buffer, mode="wb", mtime=0) as gz:
+            write_csv(_df, gz)
+    elif fmt == "Parquet":
+        _df.to_parquet(buffer, index=False)
+    else:
+        raise ValueError(f"Unknown export format: {fmt}")
+    return buffer.getvalue()
+
+
+def export_bytes(df, fmt):
+    """The file contents of df in the given format, built once per (frame fingerprint, format)."""
+    return _export(df, frame_fingerprint(df), fmt)
+
+
+def export_button(df, file_stem, key, label="Download data"):
+    """Format picker plus a download button; the file is only built when the button is clicked."""
+    col1, col2 = st.columns([1, 2], vertical_alignment="bottom")
+    fmt = col1.selectbox("Format", list(FORMATS), key=f"{key}_format")
+    extension, mime = FORMATS[fmt]
+    col2.download_button(label, data=lambda: export_bytes(df, fmt), file_name=file_stem + extension,
+                         mime=mime, key=f"{key}_download", on_click="ignore")
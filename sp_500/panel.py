@@ -0,0 +1,89 @@
+# Multi-ticker price analytics on one aligned dates x tickers matrix
+import math
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+TRADING_DAYS = 252
+
+
+class PricePanel:
+    """Closing prices for several tickers as one float matrix (dates x tickers).
+
+    Every statistic is computed for all tickers at once along axis 0. Days a ticker
+    has no bar for (e.g. before it listed) are NaN.
+    """
+
+    def __init__(self, dates, symbols, closes):
+        self.dates = dates
+        self.symbols = list(symbols)
+        self.closes = closes
+
+    @classmethod
+    def from_prices(cls, prices):
+        """Build from {symbol: bars with a Close column}, aligned on the union of dates."""
+        closes = pd.concat({symbol: bars["Close"] for symbol, bars in prices.items()}, axis=1).sort_index()
+        return cls(closes.index, closes.columns, closes.to_numpy(dtype=float))
+
+    def returns(self):
+        """Daily simple returns; one row shorter than the closes."""
+        return self.closes[1:] / self.closes[:-1] - 1
+
+    def _rolling(self, values, window):
+        # (rows - window + 1, tickers, window) view, padded back to the input length
+        windows = sliding_window_view(values, window, axis=0)
+        padding = np.full((window - 1, values.shape[1]), np.nan)
+        return windows, padding
+
+    def rolling_mean(self, window=20):
+        windows, padding = self._rolling(self.closes, window)
+        return np.vstack([padding, windows.mean(axis=-1)])
+
+    def rolling_volatility(self, window=20):
+        """Annualized standard deviation of daily returns over the window (aligned to closes)."""
+        windows, padding = self._rolling(self.returns(), window)
+        volatility = windows.std(axis=-1, ddof=1) * math.sqrt(TRADING_DAYS)
+        return np.vstack([padding, np.full((1, len(self.symbols)), np.nan), volatility])
+
+    def drawdowns(self):
+        """Fraction below the running peak, per day and ticker (0 at a new high)."""
+        return self.closes / np.fmax.accumulate(self.closes, axis=0) - 1
+
+    def correlation(self):
+        """Correlation of daily returns, over the days every ticker traded."""
+        returns = self.returns()
+        returns = returns[np.isfinite(returns).all(axis=1)]
+        return pd.DataFrame(np.corrcoef(returns, rowvar=False).reshape(len(self.symbols), -1),
+                            index=self.symbols, columns=self.symbols)
+
+    def summary(self):
+        """Return, volatility and max drawdown per ticker over the whole panel."""
+        first = self.closes[np.argmax(np.isfinite(self.closes), axis=0), np.arange(len(self.symbols))]
+        last = self.closes[len(self.closes) - 1 - np.argmax(np.isfinite(self.closes[::-1]), axis=0),
+                           np.arange(len(self.symbols))]
+        return pd.DataFrame({
+            "Return": last / first - 1,
+            "Volatility": np.nanstd(self.returns(), axis=0, ddof=1) * math.sqrt(TRADING_DAYS),
+            "Max Drawdown": np.nanmin(self.drawdowns(), axis=0),
+        }, index=self.symbols)
+
+    def small_multiples(self, columns=5, window=20):
+        """One figure with a small closing-price chart (and rolling mean) per ticker."""
+        rows = math.ceil(len(self.symbols) / columns)
+        fig, axes = plt.subplots(rows, columns, figsize=(3 * columns, 2.2 * rows), sharex=True, squeeze=False)
+        means = self.rolling_mean(window) if len(self.dates) >= window else None
+        for i, ax in enumerate(axes.flat):
+            if i >= len(self.symbols):
+                ax.set_visible(False)
+                continue
+            ax.fill_between(self.dates, self.closes[:, i], color="darkblue", alpha=0.3)
+            ax.plot(self.dates, self.closes[:, i], color="darkblue", alpha=0.8, linewidth=1)
+            if means is not None:
+                ax.plot(self.dates, means[:, i], color="orange", linewidth=1)
+            ax.set_title(self.symbols[i], fontweight="bold", fontsize=10)
+            ax.tick_params(axis="x", labelrotation=90, labelsize=7)
+            ax.tick_params(axis="y", labelsize=7)
+        fig.tight_layout()
+        return fig
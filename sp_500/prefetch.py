@@ -0,0 +1,91 @@
+# Background prefetch of price history for every S&P 500 constituent into the price store
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class RateLimiter:
+    """Spaces calls at least 1 / rate seconds apart, across all threads."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        time.sleep(max(0.0, slot - now))
+
+
+class Prefetcher:
+    """Fills the store for a list of symbols in batches, on a background thread.
+
+    Batches run on a small thread pool behind a shared rate limit; a failed batch is
+    retried with exponential backoff and jitter. Progress can be read at any time while
+    the app keeps reading whatever has already arrived from the store.
+    """
+
+    def __init__(self, store, symbols, start, end, batch_size=50, max_workers=4, rate=2.0,
+                 retries=3, backoff=1.0):
+        self.store = store
+        self.symbols = list(dict.fromkeys(symbols))
+        self.start, self.end = start, end
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
+        self.limiter = RateLimiter(rate)
+        self.done = 0
+        self.failed = []
+        self.requests = 0
+        self.errors = []
+        self.elapsed = 0.0
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start_background(self):
+        """Start the prefetch on a daemon thread (once) and return self."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run, name="price-prefetch", daemon=True)
+            self._thread.start()
+        return self
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def run(self):
+        started = time.perf_counter()
+        batches = [self.symbols[i:i + self.batch_size] for i in range(0, len(self.symbols), self.batch_size)]
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="prefetch") as executor:
+            list(executor.map(self._fetch_batch, batches))
+        self.elapsed = time.perf_counter() - started
+
+    def _fetch_batch(self, batch):
+        for attempt in range(self.retries + 1):
+            self.limiter.wait()
+            try:
+                with self._lock:
+                    self.requests += 1
+                self.store.fill(batch, self.start, self.end)
+                break
+            except Exception as e:
+                with self._lock:
+                    self.errors.append(f"{batch[0]}..{batch[-1]}: {e}")
+                if attempt == self.retries:
+                    with self._lock:
+                        self.failed.extend(batch)
+                    break
+                time.sleep(self.backoff * 2 ** attempt * (0.5 + random.random()))
+        with self._lock:
+            self.done += len(batch)
+
+    def progress(self):
+        """Symbols processed so far, out of the total, plus failures and request count."""
+        with self._lock:
+            return {"done": self.done, "total": len(self.symbols), "failed": len(self.failed),
+                    "requests": self.requests, "running": self.running, "elapsed": self.elapsed}
@@ -1,15 +1,19 @@
 import streamlit as st
 import pandas as pd
-import base64
-import yfinance as yf
 import matplotlib.pyplot as plt
 import seaborn as sns
+from datetime import date, timedelta
+from data_viewer import data_viewer
+from export import export_button
+from panel import PricePanel
+from prefetch import Prefetcher
+from price_store import PriceStore
 
 st.title("S&P 500 App")
 
 st.markdown("""
         This app retrieves the list of the **S&P 500** (from Wikipedia) and its corresponding **stock closing price** (year-to-date)!
-        * **Python libraries:** base64, pandas, streamlit, numpy, matplotlib, seaborn
+        * **Python libraries:** pandas, streamlit, numpy, matplotlib, seaborn
         * **Data source:** [Wikipedia](https://en.wikipedia.org/wiki/List_of_S%26P_500_companies).
         """)
 
@@ -24,6 +28,48 @@ def load_data():
     return df
 
 df = load_data()
+
+# Local store of daily bars; only date ranges it doesn't hold yet are downloaded
+@st.cache_resource
+def get_price_store():
+    return PriceStore()
+
+def ytd_range():
+    return date(date.today().year, 1, 1), date.today() + timedelta(days=1)
+
+# Download year-to-date prices for every constituent in the background (once per day)
+@st.cache_resource
+def get_prefetcher(symbols, today):
+    start, end = ytd_range()
+    return Prefetcher(get_price_store(), symbols, start, end).start_background()
+
+prefetcher = get_prefetcher(tuple(df.Symbol), date.today())
+
+# Year-to-date closing prices. Symbols the prefetch has reached are read locally;
+# the others are fetched on demand.
+@st.cache_data(ttl=900)
+def load_prices(symbols):
+    start, end = ytd_range()
+    store = get_price_store()
+    prices = {}
+    for symbol in symbols:
+        bars = store.read(symbol, start, end)
+        prices[symbol] = bars if not bars.empty else store.history(symbol, start, end)
+    return prices
+
+# Prefetch progress, refreshed every 2 seconds while it runs
+def show_prefetch_progress(polling):
+    progress = prefetcher.progress()
+    if polling and not progress["running"]:
+        st.rerun()  # stop polling
+    failed = f", {progress['failed']} failed" if progress["failed"] else ""
+    st.progress(progress["done"] / max(1, progress["total"]),
+                text=f"Prices prefetched: {progress['done']}/{progress['total']}{failed}")
+
+with st.sidebar:
+    polling = prefetcher.running
+    st.fragment(show_prefetch_progress, run_every=2 if polling else None)(polling)
+
 sector = df.groupby("GICS Sector")
 
 # Build out the sidebar with the sector selection
@@ -36,50 +82,40 @@ df_selected_sector = df[(df["GICS Sector"].isin(selected_sector))]
 # Display the selected sector data in the UI
 st.header("Display Companies in Selected Sector")
 st.write("Data Dimension: " + str(df_selected_sector.shape[0]) + " rows and " + str(df_selected_sector.shape[1]) + " columns.")
-st.dataframe(df_selected_sector)
-
-# Download S&P 500 data
-def file_download(df):
-    csv = df.to_csv(index=False)
-    b64 = base64.b64encode(csv.encode()).decode()
-    href = f'<a href="data:file/csv;base64,{b64}" download="SP500.csv">Download CSV File</a>'
-    return href
+data_viewer(df_selected_sector, tuple(sorted(selected_sector)), key="sp500", label="Show companies")
 
-st.markdown(file_download(df_selected_sector), unsafe_allow_html=True)
+# Download S&P 500 data (the file is only built when the button is clicked)
+export_button(df_selected_sector, "SP500", key="sp500_export", label="Download data")
 
 if not df_selected_sector.empty:
 
-        # Pull thes stock data from yfinance
-        data = yf.download(
-                tickers = list(df_selected_sector[:10].Symbol),
-                period = "ytd",
-                interval = "1d",
-                group_by = "ticker",
-                auto_adjust = True,
-                prepost = True,
-                threads = True,
-                proxy = None
-        )
-
-        # Plot the closing price of the selected companies
-
-        def price_plot(symbol):
-                df = pd.DataFrame(data[symbol].Close) #type: ignore
-                df["Date"] = df.index
-                fig, ax = plt.subplots()
-                plt.fill_between(df.Date, df.Close, color="darkblue", alpha=0.3)
-                plt.plot(df.Date, df.Close, color="darkblue", alpha=0.8)
-                plt.xticks(rotation=90)
-                plt.title(symbol, fontweight="bold")
-                plt.xlabel("Date", fontweight="bold")
-                plt.ylabel("Closing Price", fontweight="bold")
-                st.pyplot(fig)
-
-        num_company = st.sidebar.slider("Number of Companies Stock Display", 1, 10)
+        num_company = st.sidebar.slider("Number of Companies Stock Display", 1, 50)
 
         if st.button("Show Plots"):
+                # Pull the stock data from the price store, only when the plots are requested
+                data = load_prices(tuple(df_selected_sector.Symbol[:num_company]))
+                data = {symbol: bars for symbol, bars in data.items() if not bars.empty}
+                if not data:
+                        st.warning("No price data available yet for the selected companies.")
+                        st.stop()
+
+                # One dates x tickers matrix; every statistic below is computed for all tickers at once
+                panel = PricePanel.from_prices(data)
+
+                # Plot the closing price of the selected companies as small multiples in one figure
                 st.header("Stock Closing Price")
-                for i in list(df_selected_sector.Symbol)[:num_company]:
-                        price_plot(i)
+                fig = panel.small_multiples()
+                st.pyplot(fig)
+                plt.close(fig)
+
+                st.header("Year-to-Date Summary")
+                st.dataframe(panel.summary().style.format("{:.1%}"))
+
+                if len(panel.symbols) > 1:
+                        st.header("Correlation of Daily Returns")
+                        fig, ax = plt.subplots()
+                        sns.heatmap(panel.correlation(), cmap="RdBu_r", vmin=-1, vmax=1, ax=ax)
+                        st.pyplot(fig)
+                        plt.close(fig)
 else:
         st.markdown("### No Sectors Selected")
\ No newline at end of file
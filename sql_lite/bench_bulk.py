@@ -0,0 +1,62 @@
+# Rows/sec of the per-row path in main.py vs batched executemany with WAL pragmas
+#
+# Usage (from the sql_lite folder):
+#   python bench_bulk.py [--sizes 1000 100000 1000000] [--batch-size 10000] [--per-row-max 5000]
+#
+# The per-row path commits (and syncs) every row, so it is timed on at most --per-row-max
+# rows per size and reported as a rate.
+import argparse
+import os
+import tempfile
+import time
+
+import movie_store
+
+
+def per_row_insert(connection, names):
+    """What main.py's "A" option does for each movie."""
+    cursor = connection.cursor()
+    for name in names:
+        cursor.execute("INSERT INTO `movies` (`name`) VALUES (?)", [name])
+        connection.commit()
+
+
+def timed(work, rows):
+    start = time.perf_counter()
+    work()
+    seconds = time.perf_counter() - start
+    return rows / seconds if seconds else float("inf")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark bulk movie writes.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    parser.add_argument("--batch-size", type=int, default=movie_store.BATCH_SIZE)
+    parser.add_argument("--per-row-max", type=int, default=5_000)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10}{'per-row':>14}{'bulk insert':>14}{'bulk update':>14}{'bulk delete':>14}  (rows/sec)")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            names = [f"Movie {i}" for i in range(size)]
+
+            # Current path: default journal, one commit per row
+            sample = names[:args.per_row_max]
+            connection = movie_store.connect(os.path.join(tmp, f"per_row_{size}.db"), "DELETE", "FULL")
+            per_row = timed(lambda: per_row_insert(connection, sample), len(sample))
+            connection.close()
+
+            # Bulk path: WAL, executemany in batched transactions
+            connection = movie_store.connect(os.path.join(tmp, f"bulk_{size}.db"))
+            insert = timed(lambda: movie_store.bulk_insert(connection, names, args.batch_size), size)
+            ids = [row[0] for row in connection.execute("SELECT id FROM movies")]
+            update = timed(lambda: movie_store.bulk_update(connection, ((id, f"Renamed {id}") for id in ids),
+                                                           args.batch_size), size)
+            delete = timed(lambda: movie_store.bulk_delete(connection, ids, args.batch_size), size)
+            connection.close()
+
+            print(f"{size:>10,}{per_row:>14,.0f}{insert:>14,.0f}{update:>14,.0f}{delete:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# Read/write throughput of the pooled MovieStore with one writer and a growing number of readers
+#
+# Usage (from the sql_lite folder):
+#   python bench_concurrency.py [--rows 200000] [--readers 1 2 4 8] [--seconds 5]
+#
+# sqlite3 releases the GIL while a statement runs, so reads scale with reader threads
+# up to the number of CPU cores.
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import threading
+import time
+
+import movie_store
+
+
+def run(store, readers, seconds, rows):
+    """Count reads and writes completed by reader threads and one writer thread."""
+    stop = threading.Event()
+    reads = [0] * readers
+    writes = [0]
+
+    def read_loop(slot):
+        rng = random.Random(slot)
+        while not stop.is_set():
+            store.read(movie_store.read_page, rng.randrange(rows), 20)
+            store.read(movie_store.search, f"Movie {rng.randrange(rows)}", prefix=False)
+            reads[slot] += 2
+
+    def write_loop():
+        while not stop.is_set():
+            store.write(movie_store.bulk_insert, (f"New movie {writes[0]}-{i}" for i in range(10)))
+            writes[0] += 10
+
+    threads = [threading.Thread(target=read_loop, args=(slot,)) for slot in range(readers)]
+    threads.append(threading.Thread(target=write_loop))
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return sum(reads) / seconds, writes[0] / seconds
+
+
+async def run_async(store, calls):
+    """The asyncio facade: many concurrent coroutines sharing the pool."""
+    async_store = movie_store.AsyncMovieStore(store)
+    start = time.perf_counter()
+    await asyncio.gather(*(async_store.read(movie_store.read_page, i * 20, 20) for i in range(calls)))
+    return calls / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the pooled movie store.")
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--readers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    print(f"CPU cores: {os.cpu_count()}")
+    print(f"{'readers':>8}{'reads/sec':>12}{'writes/sec':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "movies.db")
+        with movie_store.connect(path) as connection:
+            movie_store.bulk_insert(connection, (f"Movie {i}" for i in range(args.rows)))
+        for readers in args.readers:
+            store = movie_store.MovieStore(path, readers=readers)
+            reads, writes = run(store, readers, args.seconds, args.rows)
+            print(f"{readers:>8}{reads:>12,.0f}{writes:>12,.0f}")
+            store.close()
+
+        store = movie_store.MovieStore(path, readers=max(args.readers))
+        rate = asyncio.run(run_async(store, 2_000))
+        print(f"asyncio facade: {rate:,.0f} page reads/sec over {max(args.readers)} pooled readers")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
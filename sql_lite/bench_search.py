@@ -0,0 +1,73 @@
+# Latency of FTS5 search and keyset pages vs a LIKE scan, at growing table sizes
+#
+# Usage (from the sql_lite folder):
+#   python bench_search.py [--sizes 10000 1000000] [--queries 50]
+import argparse
+import itertools
+import os
+import random
+import statistics
+import tempfile
+import time
+
+import movie_store
+
+SYLLABLES = ["ka", "ro", "mi", "ten", "sha", "lo", "ver", "dan", "qui", "el", "mor", "tu", "ba", "zin",
+             "gar", "po", "li", "nex", "sa", "dor", "fi", "lum", "ar", "ost"]
+
+
+def vocabulary(size, rng):
+    """Distinct made-up words, a stand-in for the vocabulary of real film titles."""
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def titles(count, words, rng):
+    # Skewed word choice, so some words are common (like "the" or "love") and most are rare
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(words))))
+    for _ in range(count):
+        yield " ".join(word.title() for word in rng.choices(words, cum_weights=cum_weights, k=rng.randint(1, 4)))
+
+
+def median_ms(run, queries):
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        run(query)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark movie search and paging.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 1_000_000])
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    words = vocabulary(50_000, rng)
+    print(f"{'rows':>10}{'fts word':>12}{'fts prefix':>12}{'LIKE scan':>12}{'deep page':>12}  (median ms)")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            connection = movie_store.connect(os.path.join(tmp, f"movies_{size}.db"))
+            movie_store.bulk_insert(connection, titles(size, words, rng))
+            # Queries are words of stored titles: two words, or the start of one
+            sample = [name for _, name in connection.execute(
+                "SELECT id, name FROM movies WHERE name LIKE '% %' ORDER BY random() LIMIT ?", (args.queries,))]
+            queries = [" ".join(name.split()[:2]) for name in sample]
+            prefixes = [name.split()[0][:3] for name in sample]
+            after_ids = [rng.randrange(size) for _ in range(args.queries)]
+
+            fts = median_ms(lambda q: movie_store.search(connection, q, prefix=False), queries)
+            prefix = median_ms(lambda q: movie_store.search(connection, q), prefixes)
+            like = median_ms(lambda q: connection.execute(
+                "SELECT id, name FROM movies WHERE name LIKE ? LIMIT 20", (f"%{q}%",)).fetchall(), queries)
+            page = median_ms(lambda after: next(movie_store.iter_pages(connection, 20, after), None), after_ids)
+            connection.close()
+            print(f"{size:>10,}{fts:>12.2f}{prefix:>12.2f}{like:>12.2f}{page:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
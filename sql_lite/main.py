@@ -1,58 +1,84 @@
-import sqlite3
+import movie_store
 
 
-# Connection to database
-conenction = sqlite3.connect("/Users/rmorrison/Projects/Streamlit/sql_lite/db/movie.db")
-cursor = conenction.cursor()
-
-
-# Create the movies table if it doesn't exist
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS movies (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    name TEXT NOT NULL
-)
-""")
-conenction.commit()
+# Connection pool for the database (creates the movies table if it doesn't exist)
+store = movie_store.MovieStore()
 
 while True:
     choice = input(
-        "Enter your choice: Press A to add a new record, Press V to view all records, Press D to delete a record, Press U to update a record, Press Q to quit: \n"
+        "Enter your choice: Press A to add a new record, Press V to view all records, Press S to search, Press D to delete a record, Press U to update a record, "
+        "Press I to import movies from a CSV/JSON file, Press R to rename movies from a CSV/JSON file, "
+        "Press X to delete several records, Press Q to quit: \n"
     )
     choice = choice.upper()
 
     if choice == "A":
         name = input("Please enter the name of a movie: \n")
 
-        data = [name]
-        cursor.execute("INSERT INTO `movies` (`name`) VALUES (?)", data)
-        conenction.commit()
+        store.write(movie_store.add_movie, name)
 
     elif choice == "U":
         id = input("Please enter the ID of the record you want to update: \n")
         name = input("Please enter the new name of a movie: \n")
         
-        data = [name, id]
-        cursor.execute("UPDATE `movies` SET `name` = ? WHERE `id` = ?", data)
-        conenction.commit()
+        store.write(movie_store.rename_movie, id, name)
 
     elif choice == "D":
         id = input("Please enter the ID of the record you want to delete: \n")
         
-        data = [id]
-        cursor.execute("DELETE FROM `movies` WHERE `id` = ?", data)
-        conenction.commit()
+        store.write(movie_store.delete_movie, id)
+
+    elif choice == "I":
+        path = input("Please enter the path of a CSV or JSON file with a name column (JSON: a list of names or of objects): \n")
+        try:
+            count = store.write(movie_store.import_movies, path)
+            print(f"Imported {count} movies.")
+        except OSError as e:
+            print(f"Could not read {path}: {e}")
+        except (KeyError, TypeError, ValueError) as e:
+            print(f"Bad record in {path} ({e!r}); each needs a name. Batches before it were imported.")
+
+    elif choice == "R":
+        path = input("Please enter the path of a CSV or JSON file with id and name columns: \n")
+        try:
+            count = store.write(movie_store.update_movies, path)
+            print(f"Updated {count} movies.")
+        except OSError as e:
+            print(f"Could not read {path}: {e}")
+        except (KeyError, TypeError, ValueError) as e:
+            print(f"Bad record in {path} ({e!r}); each needs a numeric id and a name. Batches before it were applied.")
+
+    elif choice == "X":
+        ids = input("Please enter the IDs of the records you want to delete, separated by commas: \n")
+        try:
+            ids = [int(id) for id in ids.split(",") if id.strip()]
+        except ValueError:
+            print("IDs must be whole numbers separated by commas. Please try again.")
+            continue
+        count = store.write(movie_store.bulk_delete, ids)
+        print(f"Deleted {count} movies.")
 
     elif choice == "V":
         print("Here are all the records: \n")
-        
-        result = cursor.execute("SELECT * FROM `movies`")
-        movies = result.fetchall()
-        for movie in movies:
+
+        # One page at a time, so memory stays flat however many movies there are
+        after_id = 0
+        while page := store.read(movie_store.read_page, after_id, 20):
+            for movie in page:
+                print(f"ID: {str(movie[0])} NAME: {movie[1]}")
+            after_id = page[-1][0]
+            if len(page) == 20 and input("Press Enter for more, or Q to stop: \n").upper() == "Q":
+                break
+
+    elif choice == "S":
+        text = input("Please enter words from the movie name (the last word can be partial): \n")
+
+        for movie in store.read(movie_store.search, text):
             print(f"ID: {str(movie[0])} NAME: {movie[1]}")
             
     elif choice == "Q":
         print("Goodbye!")
+        store.close()
         break
 
     else:
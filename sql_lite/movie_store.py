@@ -0,0 +1,307 @@
+# Movie database access: connection pragmas, batched bulk writes and a thread-safe pool
+import asyncio
+import csv
+import json
+import os
+import queue
+import random
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from itertools import islice
+
+DB_PATH = os.environ.get("MOVIE_DB_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "db", "movie.db"))
+JOURNAL_MODE = os.environ.get("MOVIE_DB_JOURNAL_MODE", "WAL")
+SYNCHRONOUS = os.environ.get("MOVIE_DB_SYNCHRONOUS", "NORMAL")
+BATCH_SIZE = int(os.environ.get("MOVIE_DB_BATCH_SIZE", 10_000))
+SEARCH_CANDIDATES = 2_000  # matches ranked for a very short prefix
+SHORT_PREFIX = 2  # prefixes up to this many characters are ranked approximately
+READERS = int(os.environ.get("MOVIE_DB_READERS", 4))
+STATEMENT_CACHE = 128  # prepared statements kept per connection
+BUSY_RETRIES = 5
+BUSY_BACKOFF = 0.05  # seconds before the first retry, doubled on each one after
+JOURNAL_MODES = {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"}
+SYNCHRONOUS_LEVELS = {"OFF", "NORMAL", "FULL", "EXTRA"}
+
+
+def connect(path=DB_PATH, journal_mode=JOURNAL_MODE, synchronous=SYNCHRONOUS, **options):
+    """Open the database with the given pragmas and make sure the movies table exists.
+
+    WAL with synchronous=NORMAL syncs at checkpoints rather than on every commit; pass
+    journal_mode="DELETE", synchronous="FULL" for SQLite's defaults. Other options go
+    to sqlite3.connect.
+    """
+    journal_mode, synchronous = journal_mode.upper(), synchronous.upper()
+    if journal_mode not in JOURNAL_MODES or synchronous not in SYNCHRONOUS_LEVELS:
+        raise ValueError(f"Unsupported pragmas: journal_mode={journal_mode}, synchronous={synchronous}")
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    connection = sqlite3.connect(path, **options)
+    connection.execute(f"PRAGMA journal_mode = {journal_mode}")
+    connection.execute(f"PRAGMA synchronous = {synchronous}")
+    connection.execute("""
+    CREATE TABLE IF NOT EXISTS movies (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL
+    )
+    """)
+    create_search_index(connection)
+    connection.commit()
+    return connection
+
+
+# Full-text index over movies.name, stored by reference to the movies table (external
+# content) and kept in sync by triggers. Prefix indexes make 2-3 character prefixes cheap.
+SEARCH_SCHEMA = """
+CREATE VIRTUAL TABLE movies_fts USING fts5(name, content='movies', content_rowid='id', prefix='2 3');
+CREATE TRIGGER movies_fts_insert AFTER INSERT ON movies BEGIN
+    INSERT INTO movies_fts (rowid, name) VALUES (new.id, new.name);
+END;
+CREATE TRIGGER movies_fts_delete AFTER DELETE ON movies BEGIN
+    INSERT INTO movies_fts (movies_fts, rowid, name) VALUES ('delete', old.id, old.name);
+END;
+CREATE TRIGGER movies_fts_update AFTER UPDATE OF name ON movies BEGIN
+    INSERT INTO movies_fts (movies_fts, rowid, name) VALUES ('delete', old.id, old.name);
+    INSERT INTO movies_fts (rowid, name) VALUES (new.id, new.name);
+END;
+"""
+
+
+def create_search_index(connection):
+    """Create the FTS5 index and its triggers once, indexing any movies already stored."""
+    exists = connection.execute("SELECT 1 FROM sqlite_master WHERE name = 'movies_fts'").fetchone()
+    if not exists:
+        connection.executescript(f"BEGIN; {SEARCH_SCHEMA} INSERT INTO movies_fts (movies_fts) VALUES ('rebuild'); COMMIT;")
+
+
+def read_page(connection, after_id=0, page_size=20):
+    """The page_size movies with the smallest ids greater than after_id."""
+    return connection.execute("SELECT id, name FROM movies WHERE id > ? ORDER BY id LIMIT ?",
+                              (after_id, page_size)).fetchall()
+
+
+def iter_pages(connection, page_size=20, after_id=0):
+    """Yield pages of (id, name) rows in id order, fetching one page per query.
+
+    Keyset pagination: each page starts after the last id seen, so every page costs
+    the same however deep into the table it is.
+    """
+    while True:
+        page = read_page(connection, after_id, page_size)
+        if not page:
+            return
+        yield page
+        after_id = page[-1][0]
+
+
+def match_query(text, prefix=True):
+    """FTS5 query matching every word of text, the last one as a prefix.
+
+    Words are quoted, so punctuation and FTS operators typed by the user are literal.
+    """
+    words = ['"' + word.replace('"', '""') + '"' for word in text.split()]
+    if prefix and words:
+        words[-1] += "*"
+    return " ".join(words)
+
+
+def search(connection, text, limit=20, prefix=True, candidates=SEARCH_CANDIDATES):
+    """Best-matching (id, name) rows for text, ranked by BM25 across every match.
+
+    The exception is a last word of at most SHORT_PREFIX characters searched as a
+    prefix: it can match most of the table, so only its first `candidates` matches
+    (by id) are ranked and the results are approximate until more is typed.
+    """
+    query = match_query(text, prefix)
+    if not query:
+        return []
+    if prefix and len(text.split()[-1]) <= SHORT_PREFIX:
+        return connection.execute(
+            "SELECT rowid, name FROM (SELECT rowid, name, rank FROM movies_fts WHERE movies_fts MATCH ? LIMIT ?) "
+            "ORDER BY rank LIMIT ?",
+            (query, candidates, limit)).fetchall()
+    return connection.execute("SELECT rowid, name FROM movies_fts WHERE movies_fts MATCH ? ORDER BY rank LIMIT ?",
+                              (query, limit)).fetchall()
+
+
+def batches(rows, batch_size):
+    rows = iter(rows)
+    while batch := list(islice(rows, batch_size)):
+        yield batch
+
+
+def is_busy(error):
+    return isinstance(error, sqlite3.OperationalError) and ("locked" in str(error) or "busy" in str(error))
+
+
+def busy_retry(work, retries=BUSY_RETRIES, backoff=BUSY_BACKOFF):
+    """Call work() again, with exponential backoff, while it fails on a busy database."""
+    for attempt in range(retries + 1):
+        try:
+            return work()
+        except sqlite3.OperationalError as e:
+            if not is_busy(e) or attempt == retries:
+                raise
+        time.sleep(backoff * 2 ** attempt * (0.5 + random.random()))
+
+
+def _transaction(connection, sql, params, many=False):
+    """Run one statement in its own transaction, retried as a whole if the database is busy.
+
+    A failed attempt is rolled back before the retry, so nothing is applied twice.
+    """
+    def attempt():
+        with connection:
+            if many:
+                return connection.executemany(sql, params)
+            return connection.execute(sql, params)
+    return busy_retry(attempt)
+
+
+def _run_batched(connection, sql, rows, batch_size):
+    """executemany in batches, one transaction (and one sync) per batch; returns rows changed.
+
+    Only the batch that hit a busy database is retried; batches already committed stay
+    committed and are not replayed.
+    """
+    changed = 0
+    for batch in batches(rows, batch_size):
+        changed += _transaction(connection, sql, batch, many=True).rowcount
+    return changed
+
+
+def bulk_insert(connection, names, batch_size=BATCH_SIZE):
+    return _run_batched(connection, "INSERT INTO `movies` (`name`) VALUES (?)",
+                        ((name,) for name in names), batch_size)
+
+
+def bulk_update(connection, updates, batch_size=BATCH_SIZE):
+    """Rename movies from (id, name) pairs."""
+    return _run_batched(connection, "UPDATE `movies` SET `name` = ? WHERE `id` = ?",
+                        ((name, id) for id, name in updates), batch_size)
+
+
+def bulk_delete(connection, ids, batch_size=BATCH_SIZE):
+    return _run_batched(connection, "DELETE FROM `movies` WHERE `id` = ?", ((id,) for id in ids), batch_size)
+
+
+def add_movie(connection, name):
+    return _transaction(connection, "INSERT INTO `movies` (`name`) VALUES (?)", (name,)).lastrowid
+
+
+def rename_movie(connection, id, name):
+    return _transaction(connection, "UPDATE `movies` SET `name` = ? WHERE `id` = ?", (name, id)).rowcount
+
+
+def delete_movie(connection, id):
+    return _transaction(connection, "DELETE FROM `movies` WHERE `id` = ?", (id,)).rowcount
+
+
+def read_records(path):
+    """Yield movie records from a CSV (with a header) or JSON file as dicts.
+
+    JSON may be a list of names or a list of objects; CSV rows are streamed.
+    """
+    if path.lower().endswith(".json"):
+        with open(path, encoding="utf-8") as f:
+            items = json.load(f)
+        if not isinstance(items, list):
+            raise ValueError(f"{path} must hold a JSON list")
+        for item in items:
+            yield item if isinstance(item, dict) else {"name": item}
+    else:
+        with open(path, encoding="utf-8", newline="") as f:
+            yield from csv.DictReader(f)
+
+
+def import_movies(connection, path, batch_size=BATCH_SIZE):
+    """Insert every record's name from a CSV/JSON file; returns rows inserted."""
+    return bulk_insert(connection, (record["name"] for record in read_records(path)), batch_size)
+
+
+def update_movies(connection, path, batch_size=BATCH_SIZE):
+    """Rename movies from a CSV/JSON file of id/name records; returns rows updated."""
+    return bulk_update(connection, ((int(record["id"]), record["name"]) for record in read_records(path)),
+                       batch_size)
+
+
+class MovieStore:
+    """Connection pool for sharing the database between threads (e.g. Streamlit sessions).
+
+    One writer connection behind a lock and a bounded pool of read-only connections;
+    in WAL mode readers never block the writer or each other. Each connection keeps its
+    own prepared-statement cache. Run work with read(fn, ...) / write(fn, ...), where fn
+    takes a connection first, e.g. store.read(search, "matrix"). Reads that hit a busy
+    database are retried with exponential backoff; writes retry each transaction inside
+    fn instead, so a bulk write never replays batches it already committed.
+    """
+
+    def __init__(self, path=DB_PATH, readers=READERS, retries=BUSY_RETRIES, backoff=BUSY_BACKOFF, busy_timeout=1.0,
+                 statement_cache=STATEMENT_CACHE):
+        self.path = path
+        self.retries = retries
+        self.backoff = backoff
+        options = {"timeout": busy_timeout, "check_same_thread": False, "cached_statements": statement_cache}
+        self._writer = connect(path, **options)
+        self._write_lock = threading.Lock()
+        self._readers = queue.Queue(maxsize=readers)
+        for _ in range(readers):
+            connection = sqlite3.connect(path, **options)
+            connection.execute("PRAGMA query_only = ON")
+            self._readers.put(connection)
+
+    @contextmanager
+    def reader(self):
+        """Borrow a read-only connection, waiting if all of them are in use."""
+        connection = self._readers.get()
+        try:
+            yield connection
+        finally:
+            if connection.in_transaction:
+                connection.rollback()
+            self._readers.put(connection)
+
+    @contextmanager
+    def writer(self):
+        """Hold the single writer connection."""
+        with self._write_lock:
+            yield self._writer
+
+    def read(self, fn, *args, **kwargs):
+        """fn(connection, *args, **kwargs) on a pooled reader.
+
+        fn must finish reading before it returns (return lists, not live cursors).
+        """
+        def attempt():
+            with self.reader() as connection:
+                return fn(connection, *args, **kwargs)
+        return busy_retry(attempt, self.retries, self.backoff)
+
+    def write(self, fn, *args, **kwargs):
+        """fn(connection, *args, **kwargs) on the writer.
+
+        Not retried as a whole: fn may commit several transactions, so it must retry
+        its own (the add/rename/delete and bulk_* functions here do).
+        """
+        with self.writer() as connection:
+            return fn(connection, *args, **kwargs)
+
+    def close(self):
+        with self._write_lock:
+            self._writer.close()
+        while not self._readers.empty():
+            self._readers.get_nowait().close()
+
+
+class AsyncMovieStore:
+    """asyncio facade over a MovieStore; each call runs on a worker thread."""
+
+    def __init__(self, store):
+        self.store = store
+
+    async def read(self, fn, *args, **kwargs):
+        return await asyncio.to_thread(self.store.read, fn, *args, **kwargs)
+
+    async def write(self, fn, *args, **kwargs):
+        return await asyncio.to_thread(self.store.write, fn, *args, **kwargs)